@@ -27,6 +27,10 @@ import './App.css'
 
 const API_BASE_URL = 'https://j6zd6737m4a2sibh.manus.space/api'
 
+// Tamanho das páginas das listas de atribuições e serviços externos
+const LIMITE_ATRIBUICOES = 100
+const LIMITE_SERVICOS = 50
+
 function App() {
   const [user, setUser] = useState(null)
   const [loading, setLoading] = useState(true)
@@ -40,6 +44,7 @@ function App() {
   const [eletricistas, setEletricistas] = useState([])
   const [ferramentasEpis, setFerramentasEpis] = useState([])
   const [atribuicoes, setAtribuicoes] = useState([])
+  const [atribuicoesCursor, setAtribuicoesCursor] = useState(null)
   const [novoEletricista, setNovoEletricista] = useState('')
   const [novaFerramentaEpi, setNovaFerramentaEpi] = useState({ nome: '', tipo: 'Ferramenta' })
   const [novaAtribuicao, setNovaAtribuicao] = useState({ eletricista_id: '', ferramenta_epi_id: '', observacao: '' })
@@ -47,6 +52,7 @@ function App() {
   // Estados para aba 2 - Veículos e Materiais
   const [veiculos, setVeiculos] = useState([])
   const [servicosExternos, setServicosExternos] = useState([])
+  const [servicosCursor, setServicosCursor] = useState(null)
   const [novoVeiculo, setNovoVeiculo] = useState('')
   const [novoServico, setNovoServico] = useState({
     veiculo_id: '',
@@ -139,42 +145,49 @@ function App() {
 
   const loadData = async () => {
     try {
-      // Carregar eletricistas
-      const eletricistasRes = await fetch(`${API_BASE_URL}/eletricistas`, { credentials: 'include' })
-      if (eletricistasRes.ok) {
-        const eletricistasData = await eletricistasRes.json()
-        setEletricistas(eletricistasData)
-      }
-
-      // Carregar ferramentas e EPIs
-      const ferramentasRes = await fetch(`${API_BASE_URL}/ferramentas-epis`, { credentials: 'include' })
-      if (ferramentasRes.ok) {
-        const ferramentasData = await ferramentasRes.json()
-        setFerramentasEpis(ferramentasData)
+      // Primeira pintura numa única requisição: cadastros, atribuições em aberto e serviços recentes
+      const dashboardRes = await fetch(`${API_BASE_URL}/dashboard`, { credentials: 'include' })
+      if (dashboardRes.ok) {
+        const dashboardData = await dashboardRes.json()
+        setEletricistas(dashboardData.eletricistas)
+        setFerramentasEpis(dashboardData.ferramentas_epis)
+        setVeiculos(dashboardData.veiculos)
+        setAtribuicoes((atuais) => atuais.length ? atuais : dashboardData.atribuicoes_abertas)
+        setServicosExternos((atuais) => atuais.length ? atuais : dashboardData.servicos_recentes)
       }
+    } catch (err) {
+      setError('Erro ao carregar dados')
+    }
+    // Listas completas (inclusive atribuições devolvidas), paginadas
+    carregarAtribuicoes()
+    carregarServicos()
+  }
 
-      // Carregar atribuições
-      const atribuicoesRes = await fetch(`${API_BASE_URL}/atribuicoes`, { credentials: 'include' })
-      if (atribuicoesRes.ok) {
-        const atribuicoesData = await atribuicoesRes.json()
-        setAtribuicoes(atribuicoesData)
-      }
+  const carregarPagina = async (rota, limite, cursor) => {
+    const params = new URLSearchParams({ limit: limite })
+    if (cursor) params.set('after', cursor)
+    const response = await fetch(`${API_BASE_URL}/${rota}?${params}`, { credentials: 'include' })
+    if (!response.ok) throw new Error(`Erro ao carregar ${rota}`)
+    return response.json()
+  }
 
-      // Carregar veículos
-      const veiculosRes = await fetch(`${API_BASE_URL}/veiculos`, { credentials: 'include' })
-      if (veiculosRes.ok) {
-        const veiculosData = await veiculosRes.json()
-        setVeiculos(veiculosData)
-      }
+  const carregarAtribuicoes = async (cursor = null) => {
+    try {
+      const pagina = await carregarPagina('atribuicoes', LIMITE_ATRIBUICOES, cursor)
+      setAtribuicoes((atuais) => cursor ? [...atuais, ...pagina.items] : pagina.items)
+      setAtribuicoesCursor(pagina.next_cursor)
+    } catch (err) {
+      setError('Erro ao carregar atribuições')
+    }
+  }
 
-      // Carregar serviços externos
-      const servicosRes = await fetch(`${API_BASE_URL}/servicos-externos`, { credentials: 'include' })
-      if (servicosRes.ok) {
-        const servicosData = await servicosRes.json()
-        setServicosExternos(servicosData)
-      }
+  const carregarServicos = async (cursor = null) => {
+    try {
+      const pagina = await carregarPagina('servicos-externos', LIMITE_SERVICOS, cursor)
+      setServicosExternos((atuais) => cursor ? [...atuais, ...pagina.items] : pagina.items)
+      setServicosCursor(pagina.next_cursor)
     } catch (err) {
-      setError('Erro ao carregar dados')
+      setError('Erro ao carregar serviços externos')
     }
   }
 
@@ -342,32 +355,37 @@ function App() {
     }
   }
 
-  const exportarPDF = async (tipo) => {
+  // PDF e Excel são gerados em segundo plano (/export/jobs) para não prender o servidor
+  const exportarViaJob = async (tipo, formato, extensao, rotulo) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/export/${tipo}/pdf`, {
-        credentials: 'include'
+      const criado = await fetch(`${API_BASE_URL}/export/jobs`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        credentials: 'include',
+        body: JSON.stringify({ tipo, formato })
       })
-      
-      if (response.ok) {
-        const blob = await response.blob()
-        const url = window.URL.createObjectURL(blob)
-        const a = document.createElement('a')
-        a.href = url
-        a.download = `${tipo}.pdf`
-        a.click()
-        window.URL.revokeObjectURL(url)
-        setSuccess('PDF exportado com sucesso!')
-      } else {
-        setError('Erro ao exportar PDF')
+      if (!criado.ok) {
+        const data = await criado.json()
+        setError(data.error || `Erro ao exportar ${rotulo}`)
+        return
       }
-    } catch (err) {
-      setError('Erro de conexão')
-    }
-  }
 
-  const exportarExcel = async (tipo) => {
-    try {
-      const response = await fetch(`${API_BASE_URL}/export/${tipo}/excel`, {
+      let job = await criado.json()
+      while (job.status !== 'concluido' && job.status !== 'erro') {
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        const status = await fetch(`${API_BASE_URL}/export/jobs/${job.id}`, { credentials: 'include' })
+        if (!status.ok) {
+          setError(`Erro ao exportar ${rotulo}`)
+          return
+        }
+        job = await status.json()
+      }
+      if (job.status === 'erro') {
+        setError(`Erro ao exportar ${rotulo}`)
+        return
+      }
+
+      const response = await fetch(`${API_BASE_URL}/export/jobs/${job.id}/download`, {
         credentials: 'include'
       })
       
@@ -376,18 +394,22 @@ function App() {
         const url = window.URL.createObjectURL(blob)
         const a = document.createElement('a')
         a.href = url
-        a.download = `${tipo}.xlsx`
+        a.download = `${tipo}.${extensao}`
         a.click()
         window.URL.revokeObjectURL(url)
-        setSuccess('Excel exportado com sucesso!')
+        setSuccess(`${rotulo} exportado com sucesso!`)
       } else {
-        setError('Erro ao exportar Excel')
+        setError(`Erro ao exportar ${rotulo}`)
       }
     } catch (err) {
       setError('Erro de conexão')
     }
   }
 
+  const exportarPDF = (tipo) => exportarViaJob(tipo, 'pdf', 'pdf', 'PDF')
+
+  const exportarExcel = (tipo) => exportarViaJob(tipo, 'excel', 'xlsx', 'Excel')
+
   const getStatusBadge = (status) => {
     const statusMap = {
       'B': { label: 'Bom', variant: 'default' },
@@ -712,6 +734,11 @@ function App() {
                         </Card>
                       ))}
                   </div>
+                  {atribuicoesCursor && (
+                    <Button variant="outline" onClick={() => carregarAtribuicoes(atribuicoesCursor)}>
+                      Carregar mais
+                    </Button>
+                  )}
                 </div>
               </CardContent>
             </Card>
@@ -1086,6 +1113,11 @@ function App() {
                         </Card>
                       ))}
                   </div>
+                  {servicosCursor && (
+                    <Button variant="outline" onClick={() => carregarServicos(servicosCursor)}>
+                      Carregar mais
+                    </Button>
+                  )}
                 </div>
               </CardContent>
             </Card>
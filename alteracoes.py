@@ -0,0 +1,26 @@
+from sqlalchemy import text
+from src.models.user import db
+
+# Feed de alterações (GET /api/alteracoes): cada tabela rastreada tem
+# data_atualizacao (default/onupdate do ORM, também aplicado nos UPDATE em
+# lote) e um gatilho AFTER DELETE que grava uma lápide em registro_excluido.
+# O gatilho pega qualquer exclusão, inclusive as feitas fora do ORM.
+TABELAS_RASTREADAS = ('eletricista', 'ferramenta_epi', 'atribuicao_ferramenta_epi', 'veiculo', 'servico_externo')
+
+# Mesmo formato em que o SQLAlchemy grava DateTime no SQLite (microssegundos)
+AGORA_SQLITE = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+def criar_gatilhos_exclusao(conexao=None):
+    """Cria (se ainda não existem) os gatilhos que gravam as lápides"""
+    if conexao is None:
+        with db.engine.begin() as conexao:
+            return criar_gatilhos_exclusao(conexao)
+    if conexao.dialect.name != 'sqlite':
+        return
+    for tabela in TABELAS_RASTREADAS:
+        conexao.execute(text(
+            f"""CREATE TRIGGER IF NOT EXISTS {tabela}_excluido AFTER DELETE ON "{tabela}" BEGIN
+                INSERT INTO registro_excluido (tabela, registro_id, data_exclusao)
+                VALUES ('{tabela}', old.id, {AGORA_SQLITE});
+            END"""
+        ))
@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, request, session
 from src.models.user import User, db
+from src.models.cache_referencias import cache_usuarios
+from src.models.senhas import FilaSenhasCheia, executar, gerar_hash, metodo_configurado, precisa_rehash, verificar_senha
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -14,7 +16,16 @@ def login():
     
     user = User.query.filter_by(username=username).first()
     
-    if user and user.check_password(password):
+    try:
+        valida = user is not None and verificar_senha(user.password_hash, password)
+        if valida and precisa_rehash(user.password_hash):
+            # Hash gravado com método/custo antigo: refaz com a configuração atual
+            user.password_hash = executar(gerar_hash, password, metodo_configurado())
+            db.session.commit()
+    except FilaSenhasCheia:
+        return jsonify({'error': 'Muitos logins simultâneos, tente novamente em instantes'}), 503
+    
+    if valida:
         session['user_id'] = user.id
         session['username'] = user.username
         session['permissao'] = user.permissao
@@ -35,17 +46,26 @@ def get_current_user():
     if 'user_id' not in session:
         return jsonify({'error': 'Usuário não autenticado'}), 401
     
-    user = User.query.get(session['user_id'])
-    if not user:
-        session.clear()
+    usuario = usuario_atual()
+    if not usuario:
         return jsonify({'error': 'Usuário não encontrado'}), 401
     
-    return jsonify(user.to_dict()), 200
+    return jsonify(usuario), 200
+
+def usuario_atual():
+    """Usuário da sessão, lido do cache (permissão sempre atual, não a copiada no login).
+
+    Retorna None e limpa a sessão se o usuário não existe mais.
+    """
+    usuario = cache_usuarios.obter(session.get('user_id'))
+    if not usuario:
+        session.clear()
+    return usuario
 
 def require_auth(f):
     """Decorator para rotas que requerem autenticação"""
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        if 'user_id' not in session or not usuario_atual():
             return jsonify({'error': 'Autenticação necessária'}), 401
         return f(*args, **kwargs)
     decorated_function.__name__ = f.__name__
@@ -54,9 +74,10 @@ def require_auth(f):
 def require_admin(f):
     """Decorator para rotas que requerem permissão de admin"""
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        usuario = usuario_atual() if 'user_id' in session else None
+        if not usuario:
             return jsonify({'error': 'Autenticação necessária'}), 401
-        if session.get('permissao') != 'admin':
+        if usuario['permissao'] != 'admin':
             return jsonify({'error': 'Permissão de administrador necessária'}), 403
         return f(*args, **kwargs)
     decorated_function.__name__ = f.__name__
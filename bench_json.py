@@ -0,0 +1,102 @@
+"""Benchmark da serialização JSON de listas: to_dict() x serializadores por colunas.
+
+Monta o corpo de GET /api/atribuicoes (consulta + dicionários + JSON) sobre
+um banco temporário, combinando o caminho antigo (objetos do ORM com
+to_dict()) e o novo (SELECT só das colunas com o serializador compilado de
+src/models/serializers.py) com o json da stdlib e com o orjson.
+
+    python src/bench_json.py
+    python src/bench_json.py --linhas 50000 --repeticoes 5
+"""
+import os
+import sys
+# Mesmo ajuste de caminho do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+def preparar_banco(db, linhas):
+    inicio = datetime(2024, 1, 1)
+    with db.engine.begin() as conexao:
+        conexao.execute(text('INSERT INTO eletricista (nome, data_criacao) VALUES (:nome, :data)'), [
+            {'nome': f'Eletricista {i}', 'data': inicio} for i in range(50)
+        ])
+        item_ids = conexao.execute(text('SELECT id FROM ferramenta_epi')).scalars().all()
+        conexao.execute(text(
+            'INSERT INTO atribuicao_ferramenta_epi '
+            '(eletricista_id, ferramenta_epi_id, data_retirada, data_devolucao, observacao) '
+            'VALUES (:eletricista_id, :ferramenta_epi_id, :retirada, :devolucao, :observacao)'
+        ), [
+            {
+                'eletricista_id': i % 50 + 1,
+                'ferramenta_epi_id': item_ids[i % len(item_ids)],
+                'retirada': inicio + timedelta(minutes=i),
+                'devolucao': inicio + timedelta(minutes=i, hours=8),
+                'observacao': 'Devolvido em bom estado'
+            } for i in range(linhas)
+        ])
+
+def medir(funcao, repeticoes):
+    funcao()  # aquece caches do SQLite e do SQLAlchemy
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        corpo = funcao()
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, len(corpo)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=20000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+    os.environ['EXPORT_JOBS_DIR'] = os.path.join(diretorio, 'exports')
+
+    from flask.json.provider import DefaultJSONProvider
+    from src.main import create_app, inicializar_banco
+    from src.json_provider import OrjsonProvider, orjson
+    from src.models.user import db, AtribuicaoFerramentaEPI
+    from src.models.serializers import carregar_atribuicoes, serializar_atribuicoes, serializador_atribuicoes
+
+    app = create_app()
+    inicializar_banco(app)
+    providers = {'stdlib': DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = OrjsonProvider(app)
+    else:
+        print('orjson não instalado; medindo só o json da stdlib')
+
+    def via_to_dict():
+        db.session.expunge_all()
+        atribuicoes = carregar_atribuicoes(AtribuicaoFerramentaEPI.query).order_by(AtribuicaoFerramentaEPI.id).all()
+        return serializar_atribuicoes(atribuicoes)
+
+    def via_colunas():
+        return serializador_atribuicoes(serializador_atribuicoes.query().order_by(AtribuicaoFerramentaEPI.id))
+
+    try:
+        with app.app_context():
+            preparar_banco(db, args.linhas)
+            print(f'{args.linhas} atribuições, melhor de {args.repeticoes}')
+            print(f"{'caminho':>10} {'json':>7} {'total (ms)':>11} {'dicts (ms)':>11} {'bytes':>10}")
+            for nome_caminho, caminho in [('to_dict', via_to_dict), ('colunas', via_colunas)]:
+                tempo_dicts, _ = medir(caminho, args.repeticoes)
+                for nome_json, provider in providers.items():
+                    total, tamanho = medir(lambda: provider.dumps(caminho()), args.repeticoes)
+                    print(f'{nome_caminho:>10} {nome_json:>7} {total * 1000:>11.0f} '
+                          f'{tempo_dicts * 1000:>11.0f} {tamanho:>10}')
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark de login: vazão de /api/auth/login por método e custo do hash de senha.
+
+Para cada método (formato do werkzeug, o mesmo de SENHA_HASH_METODO) cria um
+usuário com esse hash num banco temporário e dispara logins de vários
+clientes simultâneos pelo cliente de teste do Flask, passando pelo pool de
+verificação de src/models/senhas.py.
+
+    python src/bench_login.py
+    python src/bench_login.py --clientes 16 --segundos 10 --metodos scrypt pbkdf2:sha256:600000
+"""
+import os
+import sys
+# Mesmo ajuste de caminho do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+METODOS = ['scrypt', 'scrypt:16384:8:1', 'pbkdf2:sha256:1000000', 'pbkdf2:sha256:600000']
+
+def carga(app, credenciais, clientes, segundos):
+    latencias = []
+    erros = [0]
+    lock = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def cliente():
+        minhas = []
+        falhas = 0
+        client = app.test_client()
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            resposta = client.post('/api/auth/login', json=credenciais)
+            if resposta.status_code != 200:
+                falhas += 1
+                continue
+            minhas.append(time.perf_counter() - inicio)
+        with lock:
+            latencias.extend(minhas)
+            erros[0] += falhas
+
+    threads = [threading.Thread(target=cliente) for _ in range(clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencias.sort()
+    return latencias, erros[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--workers', type=int, default=None, help='threads do pool (padrão: núcleos)')
+    parser.add_argument('--metodos', nargs='+', default=METODOS)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+    os.environ['EXPORT_JOBS_DIR'] = os.path.join(diretorio, 'exports')
+
+    from src.main import create_app, inicializar_banco
+    from src.models.user import db, User
+
+    nucleos = os.cpu_count() or 1
+    try:
+        print(f'{args.clientes} clientes, {args.segundos:g}s por método, {nucleos} núcleo(s)')
+        print(f"{'método':>24} {'logins/s':>9} {'por núcleo':>11} {'p50 (ms)':>9} {'p95 (ms)':>9} {'erros':>6}")
+        for indice, metodo in enumerate(args.metodos):
+            app = create_app({
+                'SENHA_HASH_METODO': metodo,
+                'SENHA_HASH_WORKERS': args.workers,
+                'SENHA_HASH_MAX_PENDENTES': args.clientes
+            })
+            if indice == 0:
+                inicializar_banco(app)
+            credenciais = {'username': f'bench{indice}', 'password': 'senha-de-teste'}
+            with app.app_context():
+                usuario = User(username=credenciais['username'])
+                usuario.set_password(credenciais['password'])
+                db.session.add(usuario)
+                db.session.commit()
+
+            latencias, erros = carga(app, credenciais, args.clientes, args.segundos)
+            if not latencias:
+                print(f'{metodo:>24} sem logins ({erros} erros)')
+                continue
+            vazao = len(latencias) / args.segundos
+            p50 = latencias[len(latencias) // 2] * 1000
+            p95 = latencias[int(len(latencias) * 0.95)] * 1000
+            print(f'{metodo:>24} {vazao:>9.1f} {vazao / nucleos:>11.1f} {p50:>9.1f} {p95:>9.1f} {erros:>6}')
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
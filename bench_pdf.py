@@ -0,0 +1,79 @@
+"""Benchmark da renderização de PDF: tabela única x tabelas por página.
+
+Cada medição roda num processo separado para que o pico de RSS
+(ru_maxrss) seja só daquela renderização.
+
+    python src/bench_pdf.py
+    python src/bench_pdf.py 1000 10000 50000
+"""
+import os
+import sys
+# Mesmo ajuste de caminho do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resource
+import subprocess
+import time
+from datetime import datetime, timedelta
+
+QUANTIDADES_PADRAO = [1000, 5000, 20000, 50000]
+
+HEADERS = ['Eletricista', 'Item', 'Tipo', 'Data Retirada', 'Data Devolução', 'Observação']
+
+def linhas_sinteticas(quantidade):
+    inicio = datetime(2024, 1, 1)
+    for i in range(quantidade):
+        retirada = inicio + timedelta(minutes=i)
+        yield [
+            f'Eletricista {i % 150}',
+            f'Ferramenta {i % 40}',
+            'Ferramenta' if i % 2 else 'EPI',
+            retirada.strftime('%d/%m/%Y %H:%M'),
+            (retirada + timedelta(hours=8)).strftime('%d/%m/%Y %H:%M'),
+            'Devolvido sem avarias' if i % 3 else ''
+        ]
+
+def renderizar_tabela_unica(linhas, arquivo):
+    """Caminho antigo: uma única Table com todas as linhas"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+    from src.routes.export import ESTILO_TABELA, ESTILO_TITULO
+
+    doc = SimpleDocTemplate(arquivo, pagesize=A4)
+    table = Table([HEADERS] + list(linhas))
+    table.setStyle(ESTILO_TABELA)
+    doc.build([Paragraph('Benchmark', ESTILO_TITULO), Spacer(1, 12), table])
+
+def renderizar_paginado(linhas, arquivo):
+    from src.routes.export import escrever_pdf
+    escrever_pdf('Benchmark', HEADERS, linhas, arquivo)
+
+MODOS = {
+    'tabela_unica': renderizar_tabela_unica,
+    'paginado': renderizar_paginado
+}
+
+def medir(modo, quantidade):
+    """Executado no processo filho: renderiza e imprime tempo e pico de RSS"""
+    inicio = time.perf_counter()
+    with open(os.devnull, 'wb') as arquivo:
+        MODOS[modo](linhas_sinteticas(quantidade), arquivo)
+    tempo = time.perf_counter() - inicio
+    pico_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'{tempo:.3f} {pico_rss_mb:.1f}')
+
+def main(quantidades):
+    print(f"{'linhas':>8} {'modo':>14} {'tempo (s)':>10} {'pico RSS (MB)':>14}")
+    for quantidade in quantidades:
+        for modo in MODOS:
+            saida = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--medir', modo, str(quantidade)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            print(f'{quantidade:>8} {modo:>14} {saida[0]:>10} {saida[1]:>14}')
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--medir':
+        medir(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(valor) for valor in sys.argv[1:]] or QUANTIDADES_PADRAO)
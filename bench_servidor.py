@@ -0,0 +1,168 @@
+"""Teste de carga: servidor de desenvolvimento x src/serve.py (gunicorn).
+
+Sobe cada servidor num processo separado sobre o mesmo banco temporário e
+dispara requisições autenticadas de vários clientes simultâneos durante
+alguns segundos, alternando entre a listagem paginada de atribuições, a
+lista de eletricistas e o /dashboard.
+
+    python src/bench_servidor.py
+    python src/bench_servidor.py --clientes 32 --segundos 15 --workers 4 --threads 8
+"""
+import os
+import sys
+# Mesmo ajuste de caminho do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import http.client
+import json
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+ROTAS = ['/api/atribuicoes?limit=50', '/api/eletricistas', '/api/dashboard']
+
+def preparar_banco(linhas):
+    from src.main import create_app, inicializar_banco
+    from src.models.user import db
+
+    app = create_app()
+    inicializar_banco(app)
+    inicio = datetime(2024, 1, 1)
+    with app.app_context():
+        with db.engine.begin() as conexao:
+            conexao.execute(text('INSERT INTO eletricista (nome, data_criacao) VALUES (:nome, :data)'), [
+                {'nome': f'Eletricista {i}', 'data': inicio} for i in range(50)
+            ])
+            item_ids = conexao.execute(text('SELECT id FROM ferramenta_epi')).scalars().all()
+            conexao.execute(text(
+                'INSERT INTO atribuicao_ferramenta_epi '
+                '(eletricista_id, ferramenta_epi_id, data_retirada, data_devolucao, observacao) '
+                'VALUES (:eletricista_id, :ferramenta_epi_id, :retirada, :retirada, :observacao)'
+            ), [
+                {
+                    'eletricista_id': i % 50 + 1,
+                    'ferramenta_epi_id': item_ids[i % len(item_ids)],
+                    'retirada': inicio + timedelta(minutes=i),
+                    'observacao': 'Devolvido em bom estado'
+                } for i in range(linhas)
+            ])
+        db.engine.dispose()
+
+def aguardar(porta, processo, limite=30):
+    fim = time.time() + limite
+    while time.time() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError('O servidor terminou antes de responder')
+        try:
+            conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=1)
+            conexao.request('GET', '/api/auth/me')
+            conexao.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('O servidor não respondeu a tempo')
+
+def login(porta):
+    conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=10)
+    conexao.request('POST', '/api/auth/login', json.dumps({'username': 'admin', 'password': 'admin123'}),
+                    {'Content-Type': 'application/json'})
+    resposta = conexao.getresponse()
+    resposta.read()
+    return resposta.getheader('Set-Cookie').split(';')[0]
+
+def carga(porta, cookie, clientes, segundos):
+    latencias = []
+    erros = [0]
+    lock = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def cliente(indice):
+        minhas = []
+        falhas = 0
+        conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+        contador = indice
+        while time.perf_counter() < fim:
+            rota = ROTAS[contador % len(ROTAS)]
+            contador += 1
+            inicio = time.perf_counter()
+            try:
+                conexao.request('GET', rota, headers={'Cookie': cookie})
+                resposta = conexao.getresponse()
+                resposta.read()
+                if resposta.status != 200:
+                    falhas += 1
+                if resposta.getheader('Connection', '').lower() == 'close' or resposta.version == 10:
+                    conexao.close()
+            except (OSError, http.client.HTTPException):
+                falhas += 1
+                conexao.close()
+                continue
+            minhas.append(time.perf_counter() - inicio)
+        with lock:
+            latencias.extend(minhas)
+            erros[0] += falhas
+
+    threads = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencias.sort()
+    return latencias, erros[0]
+
+def medir(nome, comando, porta, args, ambiente):
+    processo = subprocess.Popen(comando, env=ambiente, start_new_session=True,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        aguardar(porta, processo)
+        cookie = login(porta)
+        latencias, erros = carga(porta, cookie, args.clientes, args.segundos)
+    finally:
+        os.killpg(processo.pid, signal.SIGTERM)
+        processo.wait()
+
+    if not latencias:
+        print(f'{nome:>12} sem respostas ({erros} erros)')
+        return
+    p50 = latencias[len(latencias) // 2] * 1000
+    p95 = latencias[int(len(latencias) * 0.95)] * 1000
+    print(f'{nome:>12} {len(latencias) / args.segundos:>8.0f} {p50:>9.1f} {p95:>9.1f} {erros:>7}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clientes', type=int, default=16)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--linhas', type=int, default=5000, help='atribuições no banco')
+    parser.add_argument('--porta', type=int, default=5099)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    ambiente = dict(os.environ,
+                    DATABASE_URL=f"sqlite:///{os.path.join(diretorio, 'bench.db')}",
+                    EXPORT_JOBS_DIR=os.path.join(diretorio, 'exports'),
+                    PORT=str(args.porta))
+    os.environ.update(ambiente)
+    try:
+        preparar_banco(args.linhas)
+        print(f'{args.clientes} clientes, {args.segundos:g}s por servidor, rotas: {", ".join(ROTAS)}')
+        print(f"{'servidor':>12} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'erros':>7}")
+        medir('dev', [sys.executable, os.path.join(DIRETORIO, 'main.py')], args.porta, args, ambiente)
+        medir(f'serve {args.workers}x{args.threads}', [
+            sys.executable, os.path.join(DIRETORIO, 'serve.py'), '--bind', f'127.0.0.1:{args.porta}',
+            '--workers', str(args.workers), '--threads', str(args.threads)
+        ], args.porta, args, ambiente)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark de leitura/escrita concorrente no SQLite: perfil padrão x perfil ajustado.
+
+Vários processos (como os workers do servidor) escrevem atribuições e
+leem a listagem ao mesmo tempo durante alguns segundos, primeiro com o
+SQLite nas configurações padrão (journal DELETE, synchronous FULL) e depois
+com os PRAGMAs de src/models/engine.py (WAL, synchronous NORMAL...).
+
+    python src/bench_sqlite.py
+    python src/bench_sqlite.py --escritores 4 --leitores 8 --segundos 10
+"""
+import os
+import sys
+# Mesmo ajuste de caminho do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.models.engine import PRAGMAS_PADRAO, aplicar_pragmas
+
+PERFIS = {
+    'padrao': {},
+    'ajustado': PRAGMAS_PADRAO
+}
+
+LISTAGEM = text(
+    'SELECT a.id, e.nome, f.nome, a.data_retirada, a.data_devolucao '
+    'FROM atribuicao_ferramenta_epi a '
+    'JOIN eletricista e ON e.id = a.eletricista_id '
+    'JOIN ferramenta_epi f ON f.id = a.ferramenta_epi_id '
+    'ORDER BY a.data_retirada DESC, a.id DESC LIMIT 50'
+)
+
+INSERCAO = text(
+    'INSERT INTO atribuicao_ferramenta_epi '
+    '(eletricista_id, ferramenta_epi_id, data_retirada, data_devolucao, observacao) '
+    'VALUES (1, 1, :retirada, :retirada, :observacao)'
+)
+
+def preparar_banco(caminho, linhas):
+    from src.models.user import db
+
+    engine = create_engine(f'sqlite:///{caminho}')
+    db.metadata.create_all(engine)
+    inicio = datetime(2024, 1, 1)
+    with engine.begin() as conexao:
+        conexao.execute(text("INSERT INTO eletricista (id, nome) VALUES (1, 'Eletricista')"))
+        conexao.execute(text("INSERT INTO ferramenta_epi (id, nome, tipo) VALUES (1, 'Multímetro', 'Ferramenta')"))
+        conexao.execute(INSERCAO, [
+            {'retirada': inicio + timedelta(minutes=i), 'observacao': 'carga inicial'} for i in range(linhas)
+        ])
+    engine.dispose()
+
+def trabalhador(caminho, perfil, papel, segundos, resultado):
+    engine = create_engine(f'sqlite:///{caminho}')
+    aplicar_pragmas(engine, PERFIS[perfil])
+    operacoes = erros = 0
+    fim = time.perf_counter() + segundos
+    while time.perf_counter() < fim:
+        try:
+            with engine.begin() as conexao:
+                if papel == 'escritor':
+                    conexao.execute(INSERCAO, {'retirada': datetime.utcnow(), 'observacao': 'benchmark'})
+                else:
+                    conexao.execute(LISTAGEM).all()
+            operacoes += 1
+        except OperationalError:
+            # "database is locked" depois de esgotar o busy timeout
+            erros += 1
+    engine.dispose()
+    resultado.put((papel, operacoes, erros))
+
+def medir(perfil, args):
+    diretorio = tempfile.mkdtemp()
+    caminho = os.path.join(diretorio, 'bench.db')
+    try:
+        preparar_banco(caminho, args.linhas)
+        if PERFIS[perfil].get('journal_mode'):
+            # journal_mode=WAL fica gravado no arquivo; aplica antes de abrir os workers
+            engine = create_engine(f'sqlite:///{caminho}')
+            aplicar_pragmas(engine, PERFIS[perfil])
+            with engine.connect():
+                pass
+            engine.dispose()
+
+        contexto = multiprocessing.get_context('spawn')
+        resultado = contexto.Queue()
+        papeis = ['escritor'] * args.escritores + ['leitor'] * args.leitores
+        processos = [
+            contexto.Process(target=trabalhador, args=(caminho, perfil, papel, args.segundos, resultado))
+            for papel in papeis
+        ]
+        for processo in processos:
+            processo.start()
+        totais = {'escritor': [0, 0], 'leitor': [0, 0]}
+        for _ in processos:
+            papel, operacoes, erros = resultado.get()
+            totais[papel][0] += operacoes
+            totais[papel][1] += erros
+        for processo in processos:
+            processo.join()
+        return totais
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--escritores', type=int, default=4)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--linhas', type=int, default=20000, help='atribuições já existentes no banco')
+    args = parser.parse_args()
+
+    print(f'{args.escritores} escritores, {args.leitores} leitores, {args.segundos:g}s por perfil')
+    print(f"{'perfil':>10} {'escritas/s':>11} {'leituras/s':>11} {'erros de lock':>14}")
+    for perfil in PERFIS:
+        totais = medir(perfil, args)
+        escritas, erros_escrita = totais['escritor']
+        leituras, erros_leitura = totais['leitor']
+        print(f'{perfil:>10} {escritas / args.segundos:>11.0f} {leituras / args.segundos:>11.0f} '
+              f'{erros_escrita + erros_leitura:>14}')
+
+if __name__ == '__main__':
+    main()
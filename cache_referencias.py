@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g
+from src.models.user import Eletricista, FerramentaEPI, User, Veiculo
+from src.models.serializers import (serializador_eletricistas, serializador_ferramentas_epis, serializador_usuarios,
+                                    serializador_veiculos)
+from src.models.versoes import ao_alterar, versoes
+
+# Cache em memória, por processo, dos cadastros de referência (eletricistas,
+# ferramentas/EPIs e veículos) e dos usuários logados, consultados por
+# require_auth/require_admin. Guarda os dicionários do payload, nunca
+# objetos do ORM, então o valor pode ser usado em qualquer sessão.
+#
+#   REFERENCIAS_CACHE_TAMANHO  máximo de entradas por tabela (LRU)
+#   REFERENCIAS_CACHE_TTL      segundos até uma entrada expirar
+#   REFERENCIAS_CACHE_VERSAO   compara com versao_tabela a cada requisição,
+#                              para enxergar alterações feitas em outros workers
+#
+# No próprio processo, todo commit que altera a tabela invalida o cache
+# (inclusive mudança de permissão ou exclusão de usuário).
+TAMANHO_PADRAO = 1000
+TTL_PADRAO = 300
+
+LISTA = 'lista'
+
+class CacheReferencias:
+    def __init__(self, modelo, serializador):
+        self.modelo = modelo
+        self.serializador = serializador
+        self.tabela = modelo.__table__.name
+        self.entradas = OrderedDict()
+        self.versao = None
+        # Incrementada a cada invalidação; um carregamento que começou antes
+        # dela não é guardado, para não reinserir dados antigos
+        self.geracao = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.lock = threading.Lock()
+
+    def obter(self, registro_id):
+        """Dicionário do registro ou None se não existir"""
+        try:
+            registro_id = int(registro_id)
+        except (TypeError, ValueError):
+            return None
+        return self._buscar(registro_id, lambda: self._carregar_registro(registro_id))
+
+    def listar(self):
+        """Lista completa, na ordem de inserção"""
+        return self._buscar(LISTA, self._carregar_lista)
+
+    def invalidar(self):
+        with self.lock:
+            self.entradas.clear()
+            self.geracao += 1
+
+    def estatisticas(self):
+        with self.lock:
+            total = self.acertos + self.falhas
+            return {
+                'entradas': len(self.entradas),
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / total, 3) if total else None
+            }
+
+    def _buscar(self, chave, carregar):
+        self._conferir_versao()
+        agora = time.monotonic()
+        with self.lock:
+            entrada = self.entradas.get(chave)
+            if entrada and entrada[0] > agora:
+                self.entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada[1]
+            self.falhas += 1
+            geracao = self.geracao
+
+        valor = carregar()
+        if valor is None:
+            return None
+        config = current_app.config
+        with self.lock:
+            if geracao != self.geracao:
+                return valor
+            self.entradas[chave] = (agora + config.get('REFERENCIAS_CACHE_TTL', TTL_PADRAO), valor)
+            self.entradas.move_to_end(chave)
+            while len(self.entradas) > config.get('REFERENCIAS_CACHE_TAMANHO', TAMANHO_PADRAO):
+                self.entradas.popitem(last=False)
+        return valor
+
+    def _conferir_versao(self):
+        if not current_app.config.get('REFERENCIAS_CACHE_VERSAO'):
+            return
+        # Uma leitura de versao_tabela por requisição para todas as tabelas
+        if 'versoes_referencias' not in g:
+            g.versoes_referencias = versoes(*(cache.tabela for cache in CACHES))
+        versao = g.versoes_referencias[self.tabela]
+        with self.lock:
+            if versao != self.versao:
+                self.entradas.clear()
+                self.geracao += 1
+                self.versao = versao
+
+    def _carregar_registro(self, registro_id):
+        linha = self.serializador.query().filter(self.modelo.id == registro_id).first()
+        return self.serializador.converter(linha) if linha else None
+
+    def _carregar_lista(self):
+        return self.serializador(self.serializador.query().order_by(self.modelo.id))
+
+cache_eletricistas = CacheReferencias(Eletricista, serializador_eletricistas)
+cache_ferramentas_epis = CacheReferencias(FerramentaEPI, serializador_ferramentas_epis)
+cache_veiculos = CacheReferencias(Veiculo, serializador_veiculos)
+cache_usuarios = CacheReferencias(User, serializador_usuarios)
+
+CACHES = [cache_eletricistas, cache_ferramentas_epis, cache_veiculos, cache_usuarios]
+
+@ao_alterar
+def _invalidar_caches(tabelas):
+    for cache in CACHES:
+        if cache.tabela in tabelas:
+            cache.invalidar()
+
+def estatisticas_caches():
+    return {cache.tabela: cache.estatisticas() for cache in CACHES}
@@ -0,0 +1,27 @@
+from flask import request
+from src.models.serializers import CampoInvalido
+
+# Campos esparsos nas listagens e buscas: ?fields=id,nome limita as colunas
+# do SELECT e do payload; ?include=materiais,checklist_cinto escolhe os
+# dados aninhados dos serviços externos.
+
+def ler_lista(parametro):
+    valor = request.args.get(parametro)
+    if valor is None:
+        return None
+    return [nome.strip() for nome in valor.split(',') if nome.strip()]
+
+def serializador_solicitado(serializador):
+    """Serializador reduzido a ?fields e ?include (CampoInvalido se algum nome não existir)"""
+    campos = ler_lista('fields')
+    includes = ler_lista('include')
+    if campos is None and includes is None:
+        return serializador
+    if campos == []:
+        raise CampoInvalido('Informe ao menos um campo em fields')
+    return serializador.selecionar(campos, includes)
+
+def projetar(itens, serializador):
+    """Aplica os campos do serializador a dicionários já prontos (ex.: do cache)"""
+    nomes = serializador.nomes
+    return [{nome: item[nome] for nome in nomes} for item in itens]
@@ -0,0 +1,136 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli é opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard é opcional
+    zstandard = None
+
+# Compressão das respostas de /api (JSON, NDJSON, CSV...). zstd e br só
+# entram quando os pacotes estão instalados; gzip vem da stdlib.
+#
+#   COMPRESSAO                 '0' desliga
+#   COMPRESSAO_MINIMO          bytes abaixo dos quais a resposta vai sem compressão
+#   COMPRESSAO_NIVEL_GZIP      1-9
+#   COMPRESSAO_NIVEL_BR        0-11
+#   COMPRESSAO_NIVEL_ZSTD      1-22
+#
+# Respostas em streaming (?stream=, exportações CSV/NDJSON) são comprimidas
+# bloco a bloco, com flush a cada bloco para o cliente continuar recebendo
+# os dados aos poucos.
+MINIMO_PADRAO = 1024
+NIVEIS_PADRAO = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+COMPRIMIVEIS = ('application/json', 'application/x-ndjson', 'text/')
+
+class CompressorGzip:
+    def __init__(self, nivel):
+        self.compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados):
+        return self.compressor.compress(dados)
+
+    def descarregar(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self):
+        return self.compressor.flush()
+
+class CompressorBrotli:
+    def __init__(self, nivel):
+        self.compressor = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, dados):
+        return self.compressor.process(dados)
+
+    def descarregar(self):
+        return self.compressor.flush()
+
+    def finalizar(self):
+        return self.compressor.finish()
+
+class CompressorZstd:
+    def __init__(self, nivel):
+        self.compressor = zstandard.ZstdCompressor(level=nivel).compressobj()
+
+    def comprimir(self, dados):
+        return self.compressor.compress(dados)
+
+    def descarregar(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finalizar(self):
+        return self.compressor.flush()
+
+# Ordem de preferência quando o cliente aceita mais de uma com a mesma qualidade
+COMPRESSORES = [('zstd', CompressorZstd, zstandard), ('br', CompressorBrotli, brotli), ('gzip', CompressorGzip, zlib)]
+
+def escolher_codificacao():
+    melhor = None
+    qualidade_melhor = 0
+    for codificacao, _, modulo in COMPRESSORES:
+        if modulo is None:
+            continue
+        qualidade = request.accept_encodings[codificacao]
+        if qualidade > qualidade_melhor:
+            melhor = codificacao
+            qualidade_melhor = qualidade
+    return melhor
+
+def novo_compressor(codificacao, config):
+    nivel = config.get(f'COMPRESSAO_NIVEL_{codificacao.upper()}', NIVEIS_PADRAO[codificacao])
+    return next(classe for nome, classe, _ in COMPRESSORES if nome == codificacao)(nivel)
+
+def comprimir_stream(iteravel, compressor):
+    try:
+        for bloco in iteravel:
+            if isinstance(bloco, str):
+                bloco = bloco.encode()
+            dados = compressor.comprimir(bloco) + compressor.descarregar()
+            if dados:
+                yield dados
+        yield compressor.finalizar()
+    finally:
+        fechar = getattr(iteravel, 'close', None)
+        if fechar:
+            fechar()
+
+def configurar_compressao(app):
+    """Registra a compressão das respostas de /api"""
+    if not app.config.get('COMPRESSAO', True):
+        return
+
+    @app.after_request
+    def comprimir_resposta(response):
+        if (not request.path.startswith('/api/') or response.direct_passthrough
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRIMIVEIS)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        codificacao = escolher_codificacao()
+        if codificacao is None:
+            return response
+
+        if not response.is_streamed and response.calculate_content_length() < app.config.get('COMPRESSAO_MINIMO', MINIMO_PADRAO):
+            return response
+
+        compressor = novo_compressor(codificacao, app.config)
+        if response.is_streamed:
+            response.response = comprimir_stream(response.response, compressor)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compressor.comprimir(response.get_data()) + compressor.finalizar())
+        response.headers['Content-Encoding'] = codificacao
+
+        # O corpo mudou: a ETag de condicional() passa a valer só como fraca
+        etag, fraca = response.get_etag()
+        if etag and not fraca:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,33 @@
+import hashlib
+from flask import request, make_response
+from src.models.versoes import versoes
+
+def gerar_etag(tabelas):
+    """ETag da requisição atual: caminho com query string e versões das tabelas"""
+    atuais = versoes(*tabelas)
+    chave = request.full_path + '|' + ','.join(f'{tabela}={atuais[tabela]}' for tabela in tabelas)
+    return hashlib.sha1(chave.encode()).hexdigest()
+
+def condicional(*tabelas):
+    """Decorator de rotas GET: ETag a partir das versões das tabelas da resposta.
+
+    Se o If-None-Match do cliente ainda vale, responde 304 sem executar a rota.
+    As versões são lidas antes da consulta, então uma alteração concorrente
+    no máximo gera uma ETag antiga para dados novos, nunca o contrário.
+    """
+    def decorator(f):
+        def decorated_function(*args, **kwargs):
+            etag = gerar_etag(tabelas)
+            if request.if_none_match.contains_weak(etag):
+                resposta = make_response('', 304)
+            else:
+                resposta = make_response(f(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+            resposta.set_etag(etag)
+            resposta.cache_control.private = True
+            resposta.cache_control.no_cache = True
+            return resposta
+        decorated_function.__name__ = f.__name__
+        return decorated_function
+    return decorator
@@ -0,0 +1,35 @@
+import pytest
+from src.main import create_app, inicializar_banco
+from src.models.cache_referencias import CACHES
+
+# test_server.py é uma cópia antiga do main.py, não um módulo de testes
+collect_ignore = ['test_server.py']
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+        'EXPORT_JOBS_DIR': str(tmp_path / 'exports'),
+        # Hash barato: os testes de login não medem o custo do hash
+        'SENHA_HASH_METODO': 'pbkdf2:sha256:1000'
+    })
+    inicializar_banco(app)
+    # Os caches são por processo e sobrevivem entre os bancos de cada teste
+    for cache in CACHES:
+        cache.invalidar()
+    yield app
+    with app.app_context():
+        from src.models.user import db
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin(client):
+    """Cliente já autenticado como o admin dos dados padrão"""
+    resposta = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    assert resposta.status_code == 200
+    return client
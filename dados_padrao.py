@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+from sqlalchemy import insert, select, text, tuple_
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db, User, FerramentaEPI, Veiculo
+from src.models.senhas import gerar_hash
+
+# Dados padrão (usuário admin, ferramentas/EPIs e veículos) vêm de um
+# arquivo JSON (src/dados_padrao.json, ou DADOS_PADRAO). Cada "versao" do
+# arquivo é aplicada uma única vez e registrada em seed_versao; depois disso
+# a inicialização custa só a leitura desse registro. Para acrescentar dados
+# a um banco existente, edite o arquivo e incremente a versão: apenas os
+# registros que ainda não existem são inseridos.
+
+def carregar_dados_padrao(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+def inserir_faltantes(modelo, chaves, registros, preparar=None):
+    """Insere em lote os registros cuja chave ainda não existe na tabela.
+
+    Uma consulta para as chaves existentes e um INSERT para as que faltam.
+    Retorna quantos registros foram inseridos.
+    """
+    colunas = [getattr(modelo, chave) for chave in chaves]
+    valores = {tuple(registro[chave] for chave in chaves): registro for registro in registros}
+    if not valores:
+        return 0
+
+    if len(colunas) == 1:
+        filtro = colunas[0].in_([valor[0] for valor in valores])
+    else:
+        filtro = tuple_(*colunas).in_(list(valores))
+    existentes = {tuple(linha) for linha in db.session.execute(select(*colunas).where(filtro))}
+
+    faltantes = [registro for valor, registro in valores.items() if valor not in existentes]
+    if faltantes:
+        if preparar:
+            faltantes = [preparar(registro) for registro in faltantes]
+        db.session.execute(insert(modelo), faltantes)
+    return len(faltantes)
+
+def preparar_usuario(registro):
+    return {
+        'username': registro['username'],
+        'permissao': registro.get('permissao', 'colaborador'),
+        'password_hash': gerar_hash(registro['password'])
+    }
+
+def aplicar_dados_padrao(caminho):
+    """Aplica a versão atual dos dados padrão, se ainda não foi aplicada.
+
+    Retorna {tabela: inseridos} ou None quando a versão já estava registrada.
+    """
+    dados = carregar_dados_padrao(caminho)
+    versao = dados['versao']
+
+    db.session.execute(text(
+        'CREATE TABLE IF NOT EXISTS seed_versao ('
+        'versao INTEGER PRIMARY KEY, '
+        'aplicada_em DATETIME NOT NULL)'
+    ))
+    aplicada = db.session.execute(
+        text('SELECT 1 FROM seed_versao WHERE versao = :versao'), {'versao': versao}
+    ).first()
+    if aplicada:
+        db.session.commit()
+        return None
+
+    inseridos = {
+        'user': inserir_faltantes(User, ['username'], dados.get('usuarios', []), preparar_usuario),
+        'ferramenta_epi': inserir_faltantes(FerramentaEPI, ['nome', 'tipo'], dados.get('ferramentas_epis', [])),
+        'veiculo': inserir_faltantes(Veiculo, ['identificacao'], dados.get('veiculos', []))
+    }
+    db.session.execute(
+        text('INSERT INTO seed_versao (versao, aplicada_em) VALUES (:versao, :aplicada_em)'),
+        {'versao': versao, 'aplicada_em': datetime.utcnow()}
+    )
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Outro processo aplicou a mesma versão ao mesmo tempo
+        db.session.rollback()
+        return None
+    return inseridos
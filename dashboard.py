@@ -0,0 +1,59 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import func, select
+from src.models.user import db, AtribuicaoFerramentaEPI, ServicoExterno
+from src.routes.auth import require_auth, require_admin
+from src.routes.condicional import condicional
+from src.models.serializers import (TABELAS_ATRIBUICOES, TABELAS_SERVICOS, carregar_servicos, serializar_servicos,
+                                    serializador_atribuicoes)
+from src.models.cache_referencias import (cache_eletricistas, cache_ferramentas_epis, cache_veiculos,
+                                           estatisticas_caches)
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# Quantidade de serviços externos mais recentes enviados na tela inicial
+SERVICOS_RECENTES = 20
+
+@dashboard_bp.route('/dashboard', methods=['GET'])
+@require_auth
+@condicional(*TABELAS_ATRIBUICOES, *TABELAS_SERVICOS)
+def get_dashboard():
+    """Tudo que a tela inicial precisa numa única resposta, em um número fixo de consultas"""
+    # Listas de referência do cache, na mesma ordem das rotas de listagem
+    eletricistas = cache_eletricistas.listar()
+    ferramentas_epis = cache_ferramentas_epis.listar()
+    veiculos = cache_veiculos.listar()
+
+    atribuicoes_abertas = serializador_atribuicoes(serializador_atribuicoes.query().filter(
+        AtribuicaoFerramentaEPI.data_devolucao.is_(None)
+    ).order_by(AtribuicaoFerramentaEPI.data_retirada.desc(), AtribuicaoFerramentaEPI.id.desc()))
+
+    servicos = carregar_servicos(ServicoExterno.query).order_by(
+        ServicoExterno.data_hora_saida.desc(), ServicoExterno.id.desc()
+    ).limit(SERVICOS_RECENTES).all()
+
+    total_atribuicoes, total_servicos = db.session.execute(select(
+        select(func.count()).select_from(AtribuicaoFerramentaEPI).scalar_subquery(),
+        select(func.count()).select_from(ServicoExterno).scalar_subquery()
+    )).one()
+
+    return jsonify({
+        'eletricistas': eletricistas,
+        'ferramentas_epis': ferramentas_epis,
+        'veiculos': veiculos,
+        'atribuicoes_abertas': atribuicoes_abertas,
+        'servicos_recentes': serializar_servicos(servicos),
+        'contagens': {
+            'eletricistas': len(eletricistas),
+            'ferramentas_epis': len(ferramentas_epis),
+            'veiculos': len(veiculos),
+            'atribuicoes': total_atribuicoes,
+            'atribuicoes_abertas': len(atribuicoes_abertas),
+            'servicos_externos': total_servicos
+        }
+    })
+
+@dashboard_bp.route('/dashboard/cache', methods=['GET'])
+@require_admin
+def get_cache_estatisticas():
+    """Acertos e falhas do cache de referências deste processo"""
+    return jsonify(estatisticas_caches())
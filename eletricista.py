@@ -1,14 +1,31 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, abort, jsonify, request
 from src.models.user import Eletricista, db
 from src.routes.auth import require_auth, require_admin
+from src.routes.pagination import listar, paginacao_solicitada
+from src.routes.streaming import formato_stream
+from src.routes.campos import projetar, serializador_solicitado
+from src.models.cache_referencias import cache_eletricistas
+from src.models.serializers import CampoInvalido, serializador_eletricistas
+from src.routes.condicional import condicional
+from src.routes.lotes import LoteInvalido, erro_item, ler_lote, resposta_lote
 
 eletricista_bp = Blueprint('eletricista', __name__)
 
 @eletricista_bp.route('/eletricistas', methods=['GET'])
 @require_auth
+@condicional('eletricista')
 def get_eletricistas():
-    eletricistas = Eletricista.query.all()
-    return jsonify([eletricista.to_dict() for eletricista in eletricistas])
+    try:
+        serializador = serializador_solicitado(serializador_eletricistas)
+    except CampoInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not paginacao_solicitada() and not formato_stream():
+        itens = cache_eletricistas.listar()
+        if serializador is not serializador_eletricistas:
+            itens = projetar(itens, serializador)
+        return jsonify(itens)
+    return listar(serializador.query(), Eletricista.data_criacao, Eletricista.id, serializador)
 
 @eletricista_bp.route('/eletricistas', methods=['POST'])
 @require_admin
@@ -25,11 +42,39 @@ def create_eletricista():
     
     return jsonify(eletricista.to_dict()), 201
 
+@eletricista_bp.route('/eletricistas/bulk', methods=['POST'])
+@require_admin
+def create_eletricistas_bulk():
+    try:
+        itens = ler_lote()
+    except LoteInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    
+    eletricistas = []
+    erros = []
+    for indice, item in enumerate(itens):
+        nome = item.get('nome') if isinstance(item, dict) else None
+        if not nome:
+            erros.append(erro_item(indice, 'Nome é obrigatório'))
+            continue
+        eletricistas.append(Eletricista(nome=nome))
+    
+    # Todo o lote numa única transação
+    db.session.add_all(eletricistas)
+    db.session.flush()
+    criados = [eletricista.to_dict() for eletricista in eletricistas]
+    db.session.commit()
+    
+    return resposta_lote(criados, erros)
+
 @eletricista_bp.route('/eletricistas/<int:eletricista_id>', methods=['GET'])
 @require_auth
+@condicional('eletricista')
 def get_eletricista(eletricista_id):
-    eletricista = Eletricista.query.get_or_404(eletricista_id)
-    return jsonify(eletricista.to_dict())
+    eletricista = cache_eletricistas.obter(eletricista_id)
+    if eletricista is None:
+        abort(404)
+    return jsonify(eletricista)
 
 @eletricista_bp.route('/eletricistas/<int:eletricista_id>', methods=['PUT'])
 @require_admin
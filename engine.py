@@ -0,0 +1,66 @@
+import os
+from sqlalchemy import event
+
+# Perfil do SQLite aplicado em cada conexão nova. Cada valor pode ser
+# sobrescrito pela variável de ambiente SQLITE_<NOME> (ex.: SQLITE_BUSY_TIMEOUT=10000).
+#   journal_mode=WAL     leitores não bloqueiam escritores e vice-versa
+#   synchronous=NORMAL   seguro com WAL; fsync só nos checkpoints
+#   busy_timeout         ms esperando o lock de escrita antes de "database is locked"
+#   cache_size           negativo = KiB de cache de páginas por conexão
+#   mmap_size            bytes do arquivo lidos via mmap
+#   temp_store=MEMORY    tabelas temporárias e ordenações em memória
+PRAGMAS_PADRAO = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY'
+}
+
+# Pool de conexões do SQLAlchemy; variável de ambiente DB_<NOME> (ex.: DB_POOL_SIZE=10)
+POOL_PADRAO = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_timeout': 30,
+    'pool_recycle': 3600
+}
+
+def ler_pragmas(environ=os.environ):
+    pragmas = {}
+    for nome, padrao in PRAGMAS_PADRAO.items():
+        valor = environ.get(f'SQLITE_{nome.upper()}', padrao)
+        pragmas[nome] = int(valor) if isinstance(padrao, int) else str(valor)
+    return pragmas
+
+def ler_pool(environ=os.environ):
+    return {nome: int(environ.get(f'DB_{nome.upper()}', padrao)) for nome, padrao in POOL_PADRAO.items()}
+
+def configurar_banco(app):
+    """Preenche a configuração do engine antes do db.init_app.
+
+    Valores já presentes em app.config têm prioridade sobre o ambiente.
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    opcoes = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if uri.startswith('sqlite'):
+        app.config.setdefault('SQLITE_PRAGMAS', ler_pragmas())
+        # SQLite em memória usa um pool de conexão única, sem essas opções
+        if ':memory:' not in uri and uri not in ('sqlite://', 'sqlite:///'):
+            for nome, valor in ler_pool().items():
+                opcoes.setdefault(nome, valor)
+    else:
+        for nome, valor in ler_pool().items():
+            opcoes.setdefault(nome, valor)
+
+def aplicar_pragmas(engine, pragmas):
+    """Executa os PRAGMAs em cada conexão aberta pelo engine"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _ao_conectar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome}={valor}')
+        cursor.close()
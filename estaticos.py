@@ -0,0 +1,135 @@
+import gzip
+import mimetypes
+import os
+import re
+from flask import current_app, request, send_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Frontend compilado (pasta static): um manifesto em memória, montado na
+# inicialização, evita os os.path.exists por requisição. Para cada arquivo
+# guarda tamanho, ETag e as variantes pré-comprimidas (.br/.gz geradas no
+# build ou com `flask compress-static`), escolhidas pelo Accept-Encoding.
+#
+#   ESTATICOS_IMUTAVEIS  regex dos nomes com hash de conteúdo, servidos com
+#                        Cache-Control immutable (padrão: assets/ do Vite)
+#
+# Arquivos novos na pasta só aparecem após reiniciar o servidor.
+IMUTAVEIS_PADRAO = r'(^|/)assets/.+[.-][A-Za-z0-9_-]{8,}\.\w+$'
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+
+# Ordem de preferência quando o cliente aceita as duas com a mesma qualidade
+VARIANTES = [('br', '.br'), ('gzip', '.gz')]
+
+# Não vale comprimir arquivos menores que isso nem formatos já comprimidos
+TAMANHO_MINIMO_COMPRESSAO = 256
+COMPRIMIVEIS = ('text/', 'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+                'application/wasm', 'application/manifest+json')
+
+def montar_manifesto(pasta, imutaveis):
+    """{caminho relativo: entrada} de todos os arquivos da pasta, sem as variantes .br/.gz"""
+    arquivos = {}
+    for raiz, _, nomes in os.walk(pasta):
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            arquivos[os.path.relpath(caminho, pasta).replace(os.sep, '/')] = os.stat(caminho)
+
+    padrao = re.compile(imutaveis)
+    manifesto = {}
+    for relativo, stat in arquivos.items():
+        if any(relativo.endswith(sufixo) and relativo[:-len(sufixo)] in arquivos for _, sufixo in VARIANTES):
+            continue
+        mimetype = mimetypes.guess_type(relativo)[0] or 'application/octet-stream'
+        manifesto[relativo] = {
+            'caminho': os.path.join(pasta, relativo),
+            'mimetype': mimetype,
+            'tamanho': stat.st_size,
+            'modificado': stat.st_mtime,
+            'etag': f'{stat.st_mtime_ns:x}-{stat.st_size:x}',
+            'imutavel': bool(padrao.search(relativo)),
+            'variantes': [
+                (codificacao, os.path.join(pasta, relativo + sufixo))
+                for codificacao, sufixo in VARIANTES if relativo + sufixo in arquivos
+            ]
+        }
+    return manifesto
+
+def escolher_variante(entrada):
+    """(codificação, caminho) da melhor variante aceita pelo cliente, ou (None, original)"""
+    melhor = (None, entrada['caminho'])
+    qualidade_melhor = 0
+    for codificacao, caminho in entrada['variantes']:
+        qualidade = request.accept_encodings[codificacao]
+        if qualidade > qualidade_melhor:
+            melhor = (codificacao, caminho)
+            qualidade_melhor = qualidade
+    return melhor
+
+def responder(entrada):
+    codificacao, caminho = escolher_variante(entrada)
+    response = send_file(
+        caminho,
+        mimetype=entrada['mimetype'],
+        etag=entrada['etag'] + (f'-{codificacao}' if codificacao else ''),
+        last_modified=entrada['modificado'],
+        max_age=None,
+        conditional=True
+    )
+    if codificacao:
+        response.headers['Content-Encoding'] = codificacao
+    if entrada['variantes']:
+        response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = CACHE_IMUTAVEL if entrada['imutavel'] else CACHE_REVALIDAR
+    return response
+
+def comprimir_pasta(pasta):
+    """Gera .gz (e .br, se o pacote brotli estiver instalado) dos arquivos de texto da pasta"""
+    geradas = 0
+    for relativo, entrada in montar_manifesto(pasta, IMUTAVEIS_PADRAO).items():
+        if entrada['tamanho'] < TAMANHO_MINIMO_COMPRESSAO or not entrada['mimetype'].startswith(COMPRIMIVEIS):
+            continue
+        with open(entrada['caminho'], 'rb') as arquivo:
+            conteudo = arquivo.read()
+        compressores = [('.gz', lambda dados: gzip.compress(dados, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            compressores.append(('.br', lambda dados: brotli.compress(dados, quality=11)))
+        for sufixo, comprimir in compressores:
+            comprimido = comprimir(conteudo)
+            if len(comprimido) < len(conteudo):
+                with open(entrada['caminho'] + sufixo, 'wb') as arquivo:
+                    arquivo.write(comprimido)
+                geradas += 1
+    return geradas
+
+def configurar_estaticos(app):
+    """Monta o manifesto da pasta static e registra a rota do frontend (SPA)"""
+    pasta = app.static_folder
+    imutaveis = app.config.get('ESTATICOS_IMUTAVEIS', IMUTAVEIS_PADRAO)
+    app.extensions['estaticos'] = montar_manifesto(pasta, imutaveis) if pasta and os.path.isdir(pasta) else {}
+
+    def serve(path):
+        if current_app.static_folder is None:
+            return "Static folder not configured", 404
+
+        manifesto = current_app.extensions['estaticos']
+        # Caminhos desconhecidos são rotas do frontend: respondem com o index.html
+        entrada = manifesto.get(path) or manifesto.get('index.html')
+        if entrada is None:
+            return "index.html not found", 404
+        return responder(entrada)
+
+    app.add_url_rule('/', 'serve', serve, defaults={'path': ''})
+    app.add_url_rule('/<path:path>', 'serve', serve)
+
+    @app.cli.command('compress-static')
+    def compress_static():
+        """Gera as variantes .gz/.br dos arquivos da pasta static"""
+        if not pasta or not os.path.isdir(pasta):
+            print('Pasta static não encontrada')
+            return
+        print(f'{comprimir_pasta(pasta)} variantes geradas em {pasta}')
+        app.extensions['estaticos'] = montar_manifesto(pasta, imutaveis)
@@ -1,162 +1,150 @@
-from flask import Blueprint, jsonify, request, make_response
+from flask import Blueprint, Response, jsonify, request, make_response, send_file, stream_with_context
 from src.models.user import (AtribuicaoFerramentaEPI, ServicoExterno, Eletricista, 
                             FerramentaEPI, User, Veiculo, db)
 from src.routes.auth import require_auth
+from src.routes.streaming import formato_stream, transmitir
+from src.routes.campos import serializador_solicitado
+from src.models.search_index import criterio_busca, ordem_relevancia
+from src.models.serializers import CampoInvalido, serializador_atribuicoes, serializador_servicos
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
+import csv
 import io
+import json
+import tempfile
 from datetime import datetime
+from itertools import chain, islice
 
 export_bp = Blueprint('export', __name__)
 
+# Linhas buscadas do banco por vez nas exportações
+TAMANHO_LOTE = 1000
+# Acima disso o arquivo gerado é transferido da memória para o disco
+ARQUIVO_MAXIMO_EM_MEMORIA = 1024 * 1024
+MIMETYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MIMETYPE_NDJSON = 'application/x-ndjson'
+# Linhas de dados por tabela nos PDFs; cada tabela ocupa uma página A4
+LINHAS_POR_PAGINA = 32
+
+# Estilos dos PDFs, criados uma única vez
+ESTILO_TITULO = ParagraphStyle(
+    'CustomTitle',
+    parent=getSampleStyleSheet()['Heading1'],
+    fontSize=16,
+    spaceAfter=30,
+    alignment=1  # Centralizado
+)
+ESTILO_TABELA = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
 # Rotas de busca
 @export_bp.route('/search/atribuicoes', methods=['GET'])
 @require_auth
 def search_atribuicoes():
-    eletricista_nome = request.args.get('eletricista_nome', '')
-    data_inicio = request.args.get('data_inicio', '')
-    data_fim = request.args.get('data_fim', '')
-    item_nome = request.args.get('item_nome', '')
-    
-    query = db.session.query(AtribuicaoFerramentaEPI).join(Eletricista).join(FerramentaEPI)
-    
-    if eletricista_nome:
-        query = query.filter(Eletricista.nome.ilike(f'%{eletricista_nome}%'))
-    
-    if data_inicio:
-        try:
-            data_inicio_dt = datetime.fromisoformat(data_inicio.replace('Z', '+00:00'))
-            query = query.filter(AtribuicaoFerramentaEPI.data_retirada >= data_inicio_dt)
-        except ValueError:
-            pass
-    
-    if data_fim:
-        try:
-            data_fim_dt = datetime.fromisoformat(data_fim.replace('Z', '+00:00'))
-            query = query.filter(AtribuicaoFerramentaEPI.data_retirada <= data_fim_dt)
-        except ValueError:
-            pass
+    try:
+        serializador = serializador_solicitado(serializador_atribuicoes)
+    except CampoInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    query = serializador.query().filter(*filtros_atribuicoes(request.args))
     
-    if item_nome:
-        query = query.filter(FerramentaEPI.nome.ilike(f'%{item_nome}%'))
+    formato = formato_stream()
+    if formato:
+        return transmitir(query, serializador, formato)
     
-    atribuicoes = query.all()
-    return jsonify([atribuicao.to_dict() for atribuicao in atribuicoes])
+    return jsonify(serializador(query.all()))
 
 @export_bp.route('/search/servicos-externos', methods=['GET'])
 @require_auth
 def search_servicos_externos():
-    colaborador_nome = request.args.get('colaborador_nome', '')
-    data_inicio = request.args.get('data_inicio', '')
-    data_fim = request.args.get('data_fim', '')
-    destino = request.args.get('destino', '')
-    empresa = request.args.get('empresa', '')
-    
-    query = db.session.query(ServicoExterno).join(User)
-    
-    if colaborador_nome:
-        query = query.filter(User.username.ilike(f'%{colaborador_nome}%'))
+    try:
+        serializador = serializador_solicitado(serializador_servicos)
+    except CampoInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    query = serializador.query().filter(*filtros_servicos(request.args))
+    
+    # Resultados mais relevantes primeiro quando há busca por destino/empresa
+    relevancia = ordem_relevancia(ServicoExterno, termos_servicos(request.args))
+    if relevancia is not None:
+        query = query.order_by(relevancia)
+    
+    formato = formato_stream()
+    if formato:
+        return transmitir(query, serializador, formato)
+    
+    return jsonify(serializador(query.all()))
+
+# Filtros compartilhados pelas buscas e exportações
+def filtros_atribuicoes(args):
+    """Critérios de busca das atribuições a partir dos parâmetros da requisição"""
+    criterios = [
+        criterio_busca(Eletricista, {'nome': args.get('eletricista_nome', '')}),
+        criterio_busca(FerramentaEPI, {'nome': args.get('item_nome', '')})
+    ]
+    data_inicio = ler_data(args.get('data_inicio', ''))
+    data_fim = ler_data(args.get('data_fim', ''))
     
     if data_inicio:
-        try:
-            data_inicio_dt = datetime.fromisoformat(data_inicio.replace('Z', '+00:00'))
-            query = query.filter(ServicoExterno.data_hora_saida >= data_inicio_dt)
-        except ValueError:
-            pass
-    
+        criterios.append(AtribuicaoFerramentaEPI.data_retirada >= data_inicio)
     if data_fim:
-        try:
-            data_fim_dt = datetime.fromisoformat(data_fim.replace('Z', '+00:00'))
-            query = query.filter(ServicoExterno.data_hora_saida <= data_fim_dt)
-        except ValueError:
-            pass
-    
-    if destino:
-        query = query.filter(ServicoExterno.destino.ilike(f'%{destino}%'))
+        criterios.append(AtribuicaoFerramentaEPI.data_retirada <= data_fim)
     
-    if empresa:
-        query = query.filter(ServicoExterno.empresa_atendida.ilike(f'%{empresa}%'))
+    return [criterio for criterio in criterios if criterio is not None]
+
+def filtros_servicos(args):
+    """Critérios de busca dos serviços externos a partir dos parâmetros da requisição"""
+    criterios = [
+        criterio_busca(User, {'username': args.get('colaborador_nome', '')}),
+        criterio_busca(ServicoExterno, termos_servicos(args))
+    ]
+    data_inicio = ler_data(args.get('data_inicio', ''))
+    data_fim = ler_data(args.get('data_fim', ''))
     
-    servicos = query.all()
-    result = []
-    for servico in servicos:
-        servico_dict = servico.to_dict()
-        servico_dict['materiais'] = [material.to_dict() for material in servico.materiais]
-        if servico.checklist_cinto:
-            servico_dict['checklist_cinto'] = servico.checklist_cinto.to_dict()
-        if servico.checklist_escada:
-            servico_dict['checklist_escada'] = servico.checklist_escada.to_dict()
-        result.append(servico_dict)
+    if data_inicio:
+        criterios.append(ServicoExterno.data_hora_saida >= data_inicio)
+    if data_fim:
+        criterios.append(ServicoExterno.data_hora_saida <= data_fim)
     
-    return jsonify(result)
+    return [criterio for criterio in criterios if criterio is not None]
+
+def termos_servicos(args):
+    return {'destino': args.get('destino', ''), 'empresa_atendida': args.get('empresa', '')}
+
+def ler_data(valor):
+    """Converte uma data ISO 8601; valores inválidos são ignorados (None)"""
+    if not valor:
+        return None
+    try:
+        return datetime.fromisoformat(valor.replace('Z', '+00:00'))
+    except ValueError:
+        return None
 
-# Rotas de exportação PDF
+# Rotas de exportação PDF e Excel síncronas, renderizadas na própria
+# requisição. Ficam para integrações que baixam o arquivo direto; o frontend
+# usa /export/jobs, que renderiza no pool de processos.
 @export_bp.route('/export/atribuicoes/pdf', methods=['GET'])
 @require_auth
 def export_atribuicoes_pdf():
-    atribuicoes = AtribuicaoFerramentaEPI.query.all()
-    
     # Criar PDF em memória
     buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=30,
-        alignment=1  # Centralizado
-    )
-    
-    # Conteúdo
-    story = []
-    
-    # Título
-    title = Paragraph("Relatório de Atribuições de Ferramentas e EPIs", title_style)
-    story.append(title)
-    story.append(Spacer(1, 12))
-    
-    # Dados da tabela
-    data = [['Eletricista', 'Item', 'Tipo', 'Data Retirada', 'Data Devolução', 'Observação']]
-    
-    for atribuicao in atribuicoes:
-        data.append([
-            atribuicao.eletricista.nome if atribuicao.eletricista else '',
-            atribuicao.ferramenta_epi.nome if atribuicao.ferramenta_epi else '',
-            atribuicao.ferramenta_epi.tipo if atribuicao.ferramenta_epi else '',
-            atribuicao.data_retirada.strftime('%d/%m/%Y %H:%M') if atribuicao.data_retirada else '',
-            atribuicao.data_devolucao.strftime('%d/%m/%Y %H:%M') if atribuicao.data_devolucao else 'Não devolvido',
-            atribuicao.observacao or ''
-        ])
-    
-    # Criar tabela
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(table)
-    
-    # Construir PDF
-    doc.build(story)
+    escrever_relatorio('atribuicoes', 'pdf', buffer)
     
     # Preparar resposta
-    buffer.seek(0)
     response = make_response(buffer.getvalue())
     response.headers['Content-Type'] = 'application/pdf'
     response.headers['Content-Disposition'] = 'attachment; filename=atribuicoes.pdf'
@@ -166,168 +154,275 @@ def export_atribuicoes_pdf():
 @export_bp.route('/export/servicos-externos/pdf', methods=['GET'])
 @require_auth
 def export_servicos_externos_pdf():
-    servicos = ServicoExterno.query.all()
-    
     # Criar PDF em memória
     buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=30,
-        alignment=1  # Centralizado
-    )
-    
-    # Conteúdo
-    story = []
-    
-    # Título
-    title = Paragraph("Relatório de Serviços Externos", title_style)
-    story.append(title)
-    story.append(Spacer(1, 12))
-    
-    # Dados da tabela
-    data = [['Colaborador', 'Veículo', 'Destino', 'Empresa', 'Data/Hora Saída']]
-    
-    for servico in servicos:
-        data.append([
-            servico.colaborador.username if servico.colaborador else '',
-            servico.veiculo.identificacao if servico.veiculo else '',
-            servico.destino,
-            servico.empresa_atendida,
-            servico.data_hora_saida.strftime('%d/%m/%Y %H:%M') if servico.data_hora_saida else ''
-        ])
-    
-    # Criar tabela
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(table)
-    
-    # Construir PDF
-    doc.build(story)
+    escrever_relatorio('servicos-externos', 'pdf', buffer)
     
     # Preparar resposta
-    buffer.seek(0)
     response = make_response(buffer.getvalue())
     response.headers['Content-Type'] = 'application/pdf'
     response.headers['Content-Disposition'] = 'attachment; filename=servicos_externos.pdf'
     
     return response
 
-# Rotas de exportação Excel
 @export_bp.route('/export/atribuicoes/excel', methods=['GET'])
 @require_auth
 def export_atribuicoes_excel():
-    atribuicoes = AtribuicaoFerramentaEPI.query.all()
-    
-    # Criar workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Atribuições"
-    
-    # Cabeçalhos
-    headers = ['Eletricista', 'Item', 'Tipo', 'Data Retirada', 'Data Devolução', 'Observação']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Dados
-    for row, atribuicao in enumerate(atribuicoes, 2):
-        ws.cell(row=row, column=1, value=atribuicao.eletricista.nome if atribuicao.eletricista else '')
-        ws.cell(row=row, column=2, value=atribuicao.ferramenta_epi.nome if atribuicao.ferramenta_epi else '')
-        ws.cell(row=row, column=3, value=atribuicao.ferramenta_epi.tipo if atribuicao.ferramenta_epi else '')
-        ws.cell(row=row, column=4, value=atribuicao.data_retirada.strftime('%d/%m/%Y %H:%M') if atribuicao.data_retirada else '')
-        ws.cell(row=row, column=5, value=atribuicao.data_devolucao.strftime('%d/%m/%Y %H:%M') if atribuicao.data_devolucao else 'Não devolvido')
-        ws.cell(row=row, column=6, value=atribuicao.observacao or '')
-    
-    # Ajustar largura das colunas
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Salvar em buffer
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    # Preparar resposta
-    response = make_response(buffer.getvalue())
-    response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    response.headers['Content-Disposition'] = 'attachment; filename=atribuicoes.xlsx'
-    
-    return response
+    arquivo = tempfile.SpooledTemporaryFile(max_size=ARQUIVO_MAXIMO_EM_MEMORIA)
+    escrever_relatorio('atribuicoes', 'excel', arquivo)
+    arquivo.seek(0)
+    return send_file(arquivo, mimetype=MIMETYPE_XLSX, as_attachment=True, download_name='atribuicoes.xlsx')
 
 @export_bp.route('/export/servicos-externos/excel', methods=['GET'])
 @require_auth
 def export_servicos_externos_excel():
-    servicos = ServicoExterno.query.all()
-    
-    # Criar workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Serviços Externos"
-    
+    arquivo = tempfile.SpooledTemporaryFile(max_size=ARQUIVO_MAXIMO_EM_MEMORIA)
+    escrever_relatorio('servicos-externos', 'excel', arquivo)
+    arquivo.seek(0)
+    return send_file(arquivo, mimetype=MIMETYPE_XLSX, as_attachment=True, download_name='servicos_externos.xlsx')
+
+# Rotas de exportação CSV e NDJSON (filtros iguais aos de /search/*)
+@export_bp.route('/export/atribuicoes/csv', methods=['GET'])
+@require_auth
+def export_atribuicoes_csv():
+    stmt = consulta_atribuicoes(filtros_atribuicoes(request.args))
+    return resposta_streaming(gerar_csv(stmt), 'text/csv', 'atribuicoes.csv')
+
+@export_bp.route('/export/atribuicoes/ndjson', methods=['GET'])
+@require_auth
+def export_atribuicoes_ndjson():
+    stmt = consulta_atribuicoes(filtros_atribuicoes(request.args))
+    return resposta_streaming(gerar_ndjson(stmt), MIMETYPE_NDJSON, 'atribuicoes.ndjson')
+
+@export_bp.route('/export/servicos-externos/csv', methods=['GET'])
+@require_auth
+def export_servicos_externos_csv():
+    stmt = consulta_servicos(filtros_servicos(request.args))
+    return resposta_streaming(gerar_csv(stmt), 'text/csv', 'servicos_externos.csv')
+
+@export_bp.route('/export/servicos-externos/ndjson', methods=['GET'])
+@require_auth
+def export_servicos_externos_ndjson():
+    stmt = consulta_servicos(filtros_servicos(request.args))
+    return resposta_streaming(gerar_ndjson(stmt), MIMETYPE_NDJSON, 'servicos_externos.ndjson')
+
+def resposta_streaming(gerador, mimetype, filename):
+    response = Response(stream_with_context(gerador), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+def gerar_csv(stmt):
+    """Gera o CSV em blocos de TAMANHO_LOTE linhas direto do cursor"""
+    resultado = executar_em_lotes(stmt)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(resultado.keys())
+    for linhas in resultado.partitions():
+        writer.writerows([valor_exportado(valor) for valor in linha] for linha in linhas)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def gerar_ndjson(stmt):
+    """Gera um objeto JSON por linha, em blocos de TAMANHO_LOTE linhas"""
+    resultado = executar_em_lotes(stmt)
+    colunas = list(resultado.keys())
+    for linhas in resultado.partitions():
+        yield ''.join(
+            json.dumps(dict(zip(colunas, map(valor_exportado, linha))), ensure_ascii=False) + '\n'
+            for linha in linhas
+        )
+
+def valor_exportado(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+def consulta_atribuicoes(criterios=()):
+    """Colunas das atribuições usadas nas exportações, sem carregar objetos do ORM"""
+    return (
+        db.select(AtribuicaoFerramentaEPI.id,
+                  AtribuicaoFerramentaEPI.eletricista_id,
+                  Eletricista.nome.label('eletricista_nome'),
+                  AtribuicaoFerramentaEPI.ferramenta_epi_id,
+                  FerramentaEPI.nome.label('ferramenta_epi_nome'),
+                  FerramentaEPI.tipo.label('ferramenta_epi_tipo'),
+                  AtribuicaoFerramentaEPI.data_retirada,
+                  AtribuicaoFerramentaEPI.data_devolucao,
+                  AtribuicaoFerramentaEPI.observacao)
+        .select_from(AtribuicaoFerramentaEPI)
+        .outerjoin(Eletricista, AtribuicaoFerramentaEPI.eletricista_id == Eletricista.id)
+        .outerjoin(FerramentaEPI, AtribuicaoFerramentaEPI.ferramenta_epi_id == FerramentaEPI.id)
+        .where(*criterios)
+        .order_by(AtribuicaoFerramentaEPI.id)
+    )
+
+def consulta_servicos(criterios=()):
+    """Colunas dos serviços externos usadas nas exportações, sem carregar objetos do ORM"""
+    return (
+        db.select(ServicoExterno.id,
+                  ServicoExterno.colaborador_id,
+                  User.username.label('colaborador_nome'),
+                  ServicoExterno.veiculo_id,
+                  Veiculo.identificacao.label('veiculo_identificacao'),
+                  ServicoExterno.destino,
+                  ServicoExterno.empresa_atendida,
+                  ServicoExterno.data_hora_saida)
+        .select_from(ServicoExterno)
+        .outerjoin(User, ServicoExterno.colaborador_id == User.id)
+        .outerjoin(Veiculo, ServicoExterno.veiculo_id == Veiculo.id)
+        .where(*criterios)
+        .order_by(ServicoExterno.id)
+    )
+
+def executar_em_lotes(stmt, session=None):
+    """Executa a consulta com cursor no servidor, buscando TAMANHO_LOTE linhas por vez"""
+    return (session or db.session).execute(stmt.execution_options(yield_per=TAMANHO_LOTE))
+
+def formatar_data(valor, padrao=''):
+    return valor.strftime('%d/%m/%Y %H:%M') if valor else padrao
+
+def linhas_atribuicoes(resultado):
+    for linha in resultado:
+        yield [
+            linha.eletricista_nome or '',
+            linha.ferramenta_epi_nome or '',
+            linha.ferramenta_epi_tipo or '',
+            formatar_data(linha.data_retirada),
+            formatar_data(linha.data_devolucao, 'Não devolvido'),
+            linha.observacao or ''
+        ]
+
+def linhas_servicos(resultado):
+    for linha in resultado:
+        yield [
+            linha.colaborador_nome or '',
+            linha.veiculo_identificacao or '',
+            linha.destino,
+            linha.empresa_atendida,
+            formatar_data(linha.data_hora_saida)
+        ]
+
+# Relatórios disponíveis em PDF e Excel
+RELATORIOS = {
+    'atribuicoes': {
+        'titulo': "Relatório de Atribuições de Ferramentas e EPIs",
+        'planilha': "Atribuições",
+        'headers': ['Eletricista', 'Item', 'Tipo', 'Data Retirada', 'Data Devolução', 'Observação'],
+        'consulta': consulta_atribuicoes,
+        'filtros': filtros_atribuicoes,
+        'linhas': linhas_atribuicoes
+    },
+    'servicos-externos': {
+        'titulo': "Relatório de Serviços Externos",
+        'planilha': "Serviços Externos",
+        'headers': ['Colaborador', 'Veículo', 'Destino', 'Empresa', 'Data/Hora Saída'],
+        'consulta': consulta_servicos,
+        'filtros': filtros_servicos,
+        'linhas': linhas_servicos
+    }
+}
+
+def escrever_relatorio(tipo, formato, arquivo, filtros=None, session=None):
+    """Gera o relatório `tipo` no formato 'pdf' ou 'excel' dentro de `arquivo`.
+
+    Não depende da requisição: `filtros` usa os mesmos parâmetros das rotas
+    de busca e `session` permite rodar fora do Flask (jobs de exportação).
+    """
+    relatorio = RELATORIOS[tipo]
+    criterios = relatorio['filtros'](filtros) if filtros else ()
+    resultado = executar_em_lotes(relatorio['consulta'](criterios), session)
+    linhas = relatorio['linhas'](resultado)
+    
+    if formato == 'pdf':
+        escrever_pdf(relatorio['titulo'], relatorio['headers'], linhas, arquivo)
+    else:
+        escrever_excel(relatorio['planilha'], relatorio['headers'], linhas, arquivo)
+
+def escrever_pdf(titulo, headers, linhas, arquivo):
+    """Gera o PDF página a página.
+
+    As linhas viram tabelas de LINHAS_POR_PAGINA linhas, cada uma com o
+    cabeçalho, e só são montadas quando o ReportLab chega nelas: a memória
+    fica limitada a uma página e o layout de cada tabela é pequeno.
+    """
+    doc = SimpleDocTemplate(arquivo, pagesize=A4)
+    doc.build(StoryIncremental(flowables_pdf(titulo, headers, linhas)))
+
+def flowables_pdf(titulo, headers, linhas):
+    # Título
+    yield Paragraph(titulo, ESTILO_TITULO)
+    yield Spacer(1, 12)
+    
+    # Uma tabela por página
+    linhas = iter(linhas)
+    pagina = list(islice(linhas, LINHAS_POR_PAGINA))
+    while True:
+        yield Table([headers] + pagina, style=ESTILO_TABELA, repeatRows=1)
+        pagina = list(islice(linhas, LINHAS_POR_PAGINA))
+        if not pagina:
+            break
+        yield PageBreak()
+
+class StoryIncremental(list):
+    """Story do ReportLab abastecida sob demanda a partir de um iterador.
+
+    O doc.build consome a story pela frente (len, [0], del [0]), então cada
+    flowable só é criado quando o anterior já foi desenhado.
+    """
+
+    def __init__(self, flowables):
+        super().__init__()
+        self._pendentes = iter(flowables)
+
+    def _abastecer(self, quantidade):
+        while list.__len__(self) < quantidade:
+            proximo = next(self._pendentes, None)
+            if proximo is None:
+                break
+            self.append(proximo)
+
+    def __len__(self):
+        self._abastecer(1)
+        return list.__len__(self)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, int) and indice >= 0:
+            self._abastecer(indice + 1)
+        return list.__getitem__(self, indice)
+
+def escrever_excel(titulo, headers, linhas, arquivo):
+    """Gera um XLSX em modo write-only dentro de `arquivo`.
+
+    As linhas são gravadas direto no disco conforme chegam, então a memória
+    não cresce com o tamanho do relatório. As larguras das colunas são
+    acumuladas durante a leitura, mas o XLSX exige a definição das colunas
+    antes dos dados: por isso elas são fixadas a partir do primeiro lote
+    (o único trecho mantido em memória).
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(titulo)
+
+    linhas = iter(linhas)
+    primeiro_lote = list(islice(linhas, TAMANHO_LOTE))
+    larguras = [len(header) for header in headers]
+    for linha in primeiro_lote:
+        for indice, valor in enumerate(linha):
+            larguras[indice] = max(larguras[indice], len(str(valor)))
+    for indice, largura in enumerate(larguras, 1):
+        ws.column_dimensions[get_column_letter(indice)].width = min(largura + 2, 50)
+
     # Cabeçalhos
-    headers = ['Colaborador', 'Veículo', 'Destino', 'Empresa', 'Data/Hora Saída']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
+    cabecalho = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
         cell.font = Font(bold=True)
         cell.alignment = Alignment(horizontal='center')
-    
+        cabecalho.append(cell)
+    ws.append(cabecalho)
+
     # Dados
-    for row, servico in enumerate(servicos, 2):
-        ws.cell(row=row, column=1, value=servico.colaborador.username if servico.colaborador else '')
-        ws.cell(row=row, column=2, value=servico.veiculo.identificacao if servico.veiculo else '')
-        ws.cell(row=row, column=3, value=servico.destino)
-        ws.cell(row=row, column=4, value=servico.empresa_atendida)
-        ws.cell(row=row, column=5, value=servico.data_hora_saida.strftime('%d/%m/%Y %H:%M') if servico.data_hora_saida else '')
-    
-    # Ajustar largura das colunas
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Salvar em buffer
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    # Preparar resposta
-    response = make_response(buffer.getvalue())
-    response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    response.headers['Content-Disposition'] = 'attachment; filename=servicos_externos.xlsx'
-    
-    return response
+    for linha in chain(primeiro_lote, linhas):
+        ws.append(linha)
 
+    wb.save(arquivo)
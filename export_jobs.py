@@ -0,0 +1,240 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from flask import Blueprint, current_app, jsonify, request, send_file, session, url_for
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.routes.auth import require_auth, usuario_atual
+from src.models.search_index import detectar_indice_busca
+from src.models.engine import aplicar_pragmas
+from src.routes.export import MIMETYPE_XLSX, RELATORIOS, escrever_relatorio
+
+export_jobs_bp = Blueprint('export_jobs', __name__)
+
+# Extensão e Content-Type de cada formato aceito pelos jobs
+FORMATOS = {
+    'pdf': ('pdf', 'application/pdf'),
+    'excel': ('xlsx', MIMETYPE_XLSX)
+}
+
+STATUS_FINAIS = ('concluido', 'erro')
+
+# Pool de processos compartilhado pelas requisições deste worker
+_executor = None
+_pendentes = set()
+_lock = threading.Lock()
+
+@export_jobs_bp.route('/export/jobs', methods=['POST'])
+@require_auth
+def create_export_job():
+    data = request.json or {}
+    tipo = data.get('tipo')
+    formato = data.get('formato')
+    filtros = data.get('filtros') or {}
+
+    if tipo not in RELATORIOS:
+        return jsonify({'error': 'Tipo deve ser atribuicoes ou servicos-externos'}), 400
+
+    if formato not in FORMATOS:
+        return jsonify({'error': 'Formato deve ser pdf ou excel'}), 400
+
+    if not isinstance(filtros, dict):
+        return jsonify({'error': 'Filtros devem ser um objeto'}), 400
+
+    diretorio = diretorio_jobs()
+    limpar_expirados(diretorio)
+
+    with _lock:
+        if len(_pendentes) >= current_app.config.get('EXPORT_JOBS_MAX_PENDENTES', 20):
+            return jsonify({'error': 'Fila de exportação cheia, tente novamente em instantes'}), 503
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'tipo': tipo,
+            'formato': formato,
+            'filtros': filtros,
+            'status': 'pendente',
+            'user_id': session['user_id'],
+            'criado_em': datetime.utcnow().isoformat(),
+            'concluido_em': None,
+            'erro': None
+        }
+        salvar_job(diretorio, job)
+
+        future = get_executor().submit(executar_job, diretorio, job['id'],
+                                       current_app.config['SQLALCHEMY_DATABASE_URI'],
+                                       current_app.config.get('SQLITE_PRAGMAS'))
+        _pendentes.add(future)
+
+    # Fora do lock: se o future já terminou, o callback roda aqui mesmo e pega o lock
+    future.add_done_callback(lambda f: finalizar_future(f, diretorio, job['id']))
+
+    response = jsonify(job_dict(job))
+    response.status_code = 202
+    response.headers['Location'] = url_for('export_jobs.get_export_job', job_id=job['id'])
+    return response
+
+@export_jobs_bp.route('/export/jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_export_job(job_id):
+    job = carregar_job_do_usuario(job_id)
+    if not job:
+        return jsonify({'error': 'Exportação não encontrada'}), 404
+    return jsonify(job_dict(job))
+
+@export_jobs_bp.route('/export/jobs/<job_id>/download', methods=['GET'])
+@require_auth
+def download_export_job(job_id):
+    job = carregar_job_do_usuario(job_id)
+    if not job:
+        return jsonify({'error': 'Exportação não encontrada'}), 404
+
+    if job['status'] != 'concluido':
+        return jsonify({'error': 'Exportação ainda não concluída'}), 409
+
+    extensao, mimetype = FORMATOS[job['formato']]
+    caminho = caminho_arquivo(diretorio_jobs(), job)
+    download_name = f"{job['tipo'].replace('-', '_')}.{extensao}"
+    return send_file(caminho, mimetype=mimetype, as_attachment=True, download_name=download_name)
+
+def job_dict(job):
+    resultado = {chave: valor for chave, valor in job.items() if chave != 'user_id'}
+    if job['status'] == 'concluido':
+        resultado['download_url'] = url_for('export_jobs.download_export_job', job_id=job['id'])
+    return resultado
+
+def carregar_job_do_usuario(job_id):
+    """Carrega o job se existir, não tiver expirado e pertencer ao usuário (ou se ele for admin)"""
+    diretorio = diretorio_jobs()
+    limpar_expirados(diretorio)
+    job = carregar_job(diretorio, job_id)
+    if not job:
+        return None
+    if job['user_id'] != session['user_id']:
+        # Permissão atual do usuário, não a copiada na sessão no login
+        usuario = usuario_atual()
+        if not usuario or usuario['permissao'] != 'admin':
+            return None
+    return job
+
+def diretorio_jobs():
+    diretorio = current_app.config['EXPORT_JOBS_DIR']
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: os processos de renderização não herdam conexões nem threads do servidor
+        _executor = ProcessPoolExecutor(
+            max_workers=current_app.config.get('EXPORT_JOBS_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+def finalizar_future(future, diretorio, job_id):
+    with _lock:
+        _pendentes.discard(future)
+
+    # Se o processo morreu antes de registrar o resultado, marca o job como erro
+    erro = future.exception() if not future.cancelled() else 'cancelado'
+    if erro:
+        job = carregar_job(diretorio, job_id)
+        if job and job['status'] not in STATUS_FINAIS:
+            job['status'] = 'erro'
+            job['erro'] = str(erro)
+            job['concluido_em'] = datetime.utcnow().isoformat()
+            salvar_job(diretorio, job)
+
+# Armazenamento em disco: cada job é um <id>.json com o status e o arquivo
+# gerado ao lado. Assim qualquer worker do servidor consulta o mesmo job.
+def caminho_job(diretorio, job_id):
+    return os.path.join(diretorio, f'{job_id}.json')
+
+def caminho_arquivo(diretorio, job):
+    extensao = FORMATOS[job['formato']][0]
+    return os.path.join(diretorio, f"{job['id']}.{extensao}")
+
+def carregar_job(diretorio, job_id):
+    try:
+        uuid.UUID(hex=job_id)
+    except ValueError:
+        return None
+    try:
+        with open(caminho_job(diretorio, job_id), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def salvar_job(diretorio, job):
+    caminho = caminho_job(diretorio, job['id'])
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(job, f)
+    os.replace(temporario, caminho)
+
+def limpar_expirados(diretorio):
+    """Remove jobs sem atualização há mais de EXPORT_JOBS_TTL segundos e seus arquivos.
+
+    Vale para qualquer status: um job parado em pendente/processando (worker
+    reiniciado, processo morto) também expira.
+    """
+    limite = time.time() - current_app.config.get('EXPORT_JOBS_TTL', 3600)
+    for nome in os.listdir(diretorio):
+        if not nome.endswith('.json'):
+            continue
+        caminho = os.path.join(diretorio, nome)
+        try:
+            if os.path.getmtime(caminho) >= limite:
+                continue
+            with open(caminho, encoding='utf-8') as f:
+                job = json.load(f)
+            arquivos = [caminho, caminho_arquivo(diretorio, job)]
+        except OSError:
+            continue
+        except (ValueError, KeyError, TypeError):
+            # Registro corrompido: remove só o .json
+            arquivos = [caminho]
+        for arquivo in arquivos:
+            try:
+                os.remove(arquivo)
+            except OSError:
+                pass
+
+# Executado nos processos do pool
+_engines = {}
+
+def executar_job(diretorio, job_id, database_uri, pragmas=None):
+    job = carregar_job(diretorio, job_id)
+    if job is None:
+        # Expirou ou foi removido antes de o pool chegar nele
+        return
+    job['status'] = 'processando'
+    salvar_job(diretorio, job)
+
+    engine = _engines.get(database_uri)
+    if engine is None:
+        engine = _engines[database_uri] = create_engine(database_uri)
+        aplicar_pragmas(engine, pragmas)
+
+    caminho = caminho_arquivo(diretorio, job)
+    temporario = f'{caminho}.tmp'
+    try:
+        with Session(engine) as db_session, open(temporario, 'wb') as arquivo:
+            detectar_indice_busca(db_session.connection())
+            escrever_relatorio(job['tipo'], job['formato'], arquivo, job['filtros'], db_session)
+        os.replace(temporario, caminho)
+        job['status'] = 'concluido'
+    except Exception as e:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        job['status'] = 'erro'
+        job['erro'] = str(e)
+
+    job['concluido_em'] = datetime.utcnow().isoformat()
+    salvar_job(diretorio, job)
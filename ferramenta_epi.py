@@ -1,15 +1,36 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, abort, jsonify, request
 from src.models.user import FerramentaEPI, AtribuicaoFerramentaEPI, Eletricista, db
 from src.routes.auth import require_auth, require_admin
+from src.routes.pagination import listar, paginacao_solicitada
+from src.routes.streaming import formato_stream
+from src.routes.campos import projetar, serializador_solicitado
+from src.models.cache_referencias import cache_eletricistas, cache_ferramentas_epis
+from src.routes.condicional import condicional
+from src.models.serializers import (TABELAS_ATRIBUICOES, CampoInvalido, carregar_atribuicoes, serializar_atribuicoes,
+                                    serializador_atribuicoes, serializador_ferramentas_epis)
+from src.routes.lotes import TAMANHO_MAXIMO_LOTE, LoteInvalido, erro_item, ler_lote, resposta_lote
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
 ferramenta_epi_bp = Blueprint('ferramenta_epi', __name__)
 
+ERRO_ITEM_ATRIBUIDO = 'Esta ferramenta/EPI já está atribuída a outro eletricista'
+
 @ferramenta_epi_bp.route('/ferramentas-epis', methods=['GET'])
 @require_auth
+@condicional('ferramenta_epi')
 def get_ferramentas_epis():
-    ferramentas_epis = FerramentaEPI.query.all()
-    return jsonify([item.to_dict() for item in ferramentas_epis])
+    try:
+        serializador = serializador_solicitado(serializador_ferramentas_epis)
+    except CampoInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not paginacao_solicitada() and not formato_stream():
+        itens = cache_ferramentas_epis.listar()
+        if serializador is not serializador_ferramentas_epis:
+            itens = projetar(itens, serializador)
+        return jsonify(itens)
+    return listar(serializador.query(), FerramentaEPI.data_criacao, FerramentaEPI.id, serializador)
 
 @ferramenta_epi_bp.route('/ferramentas-epis', methods=['POST'])
 @require_admin
@@ -30,11 +51,44 @@ def create_ferramenta_epi():
     
     return jsonify(ferramenta_epi.to_dict()), 201
 
+@ferramenta_epi_bp.route('/ferramentas-epis/bulk', methods=['POST'])
+@require_admin
+def create_ferramentas_epis_bulk():
+    try:
+        itens = ler_lote()
+    except LoteInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    
+    ferramentas_epis = []
+    erros = []
+    for indice, item in enumerate(itens):
+        item = item if isinstance(item, dict) else {}
+        nome = item.get('nome')
+        tipo = item.get('tipo')
+        
+        if not nome or not tipo:
+            erros.append(erro_item(indice, 'Nome e tipo são obrigatórios'))
+        elif tipo not in ['Ferramenta', 'EPI']:
+            erros.append(erro_item(indice, 'Tipo deve ser Ferramenta ou EPI'))
+        else:
+            ferramentas_epis.append(FerramentaEPI(nome=nome, tipo=tipo))
+    
+    # Todo o lote numa única transação
+    db.session.add_all(ferramentas_epis)
+    db.session.flush()
+    criados = [item.to_dict() for item in ferramentas_epis]
+    db.session.commit()
+    
+    return resposta_lote(criados, erros)
+
 @ferramenta_epi_bp.route('/ferramentas-epis/<int:item_id>', methods=['GET'])
 @require_auth
+@condicional('ferramenta_epi')
 def get_ferramenta_epi(item_id):
-    item = FerramentaEPI.query.get_or_404(item_id)
-    return jsonify(item.to_dict())
+    item = cache_ferramentas_epis.obter(item_id)
+    if item is None:
+        abort(404)
+    return jsonify(item)
 
 @ferramenta_epi_bp.route('/ferramentas-epis/<int:item_id>', methods=['PUT'])
 @require_admin
@@ -64,9 +118,14 @@ def delete_ferramenta_epi(item_id):
 # Rotas para atribuições
 @ferramenta_epi_bp.route('/atribuicoes', methods=['GET'])
 @require_auth
+@condicional(*TABELAS_ATRIBUICOES)
 def get_atribuicoes():
-    atribuicoes = AtribuicaoFerramentaEPI.query.all()
-    return jsonify([atribuicao.to_dict() for atribuicao in atribuicoes])
+    try:
+        serializador = serializador_solicitado(serializador_atribuicoes)
+    except CampoInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    return listar(serializador.query(), AtribuicaoFerramentaEPI.data_retirada,
+                  AtribuicaoFerramentaEPI.id, serializador)
 
 @ferramenta_epi_bp.route('/atribuicoes', methods=['POST'])
 @require_auth
@@ -79,24 +138,21 @@ def create_atribuicao():
     if not eletricista_id or not ferramenta_epi_id:
         return jsonify({'error': 'Eletricista e ferramenta/EPI são obrigatórios'}), 400
     
-    # Verificar se o eletricista existe
-    eletricista = Eletricista.query.get(eletricista_id)
-    if not eletricista:
+    # Verificar se o eletricista e a ferramenta/EPI existem (cache de referências)
+    if not cache_eletricistas.obter(eletricista_id):
         return jsonify({'error': 'Eletricista não encontrado'}), 404
     
-    # Verificar se a ferramenta/EPI existe
-    ferramenta_epi = FerramentaEPI.query.get(ferramenta_epi_id)
-    if not ferramenta_epi:
+    if not cache_ferramentas_epis.obter(ferramenta_epi_id):
         return jsonify({'error': 'Ferramenta/EPI não encontrado'}), 404
     
-    # Verificar se já existe uma atribuição ativa (sem devolução)
+    # Verificar se já existe uma atribuição ativa (sem devolução), pelo índice do item
     atribuicao_ativa = AtribuicaoFerramentaEPI.query.filter_by(
         ferramenta_epi_id=ferramenta_epi_id,
         data_devolucao=None
     ).first()
     
     if atribuicao_ativa:
-        return jsonify({'error': 'Esta ferramenta/EPI já está atribuída a outro eletricista'}), 400
+        return jsonify({'error': ERRO_ITEM_ATRIBUIDO}), 409
     
     atribuicao = AtribuicaoFerramentaEPI(
         eletricista_id=eletricista_id,
@@ -105,10 +161,83 @@ def create_atribuicao():
     )
     
     db.session.add(atribuicao)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Outra requisição atribuiu o item entre a verificação e o insert;
+        # o índice único parcial do banco rejeitou a segunda atribuição
+        db.session.rollback()
+        return jsonify({'error': ERRO_ITEM_ATRIBUIDO}), 409
     
     return jsonify(atribuicao.to_dict()), 201
 
+@ferramenta_epi_bp.route('/atribuicoes/bulk', methods=['POST'])
+@require_auth
+def create_atribuicoes_bulk():
+    try:
+        itens = ler_lote()
+    except LoteInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    
+    validos = []
+    erros = []
+    for indice, item in enumerate(itens):
+        item = item if isinstance(item, dict) else {}
+        if not item.get('eletricista_id') or not item.get('ferramenta_epi_id'):
+            erros.append(erro_item(indice, 'Eletricista e ferramenta/EPI são obrigatórios'))
+            continue
+        try:
+            validos.append((indice, int(item['eletricista_id']), int(item['ferramenta_epi_id']),
+                            item.get('observacao', '')))
+        except (TypeError, ValueError):
+            erros.append(erro_item(indice, 'IDs de eletricista e ferramenta/EPI devem ser números'))
+    
+    # Eletricistas e ferramentas/EPIs referenciados: uma consulta IN por tabela
+    eletricista_ids = {eletricista_id for _, eletricista_id, _, _ in validos}
+    item_ids = {ferramenta_epi_id for _, _, ferramenta_epi_id, _ in validos}
+    # (os objetos ficam na sessão e são reaproveitados pelo to_dict das atribuições criadas)
+    eletricistas = {eletricista.id: eletricista for eletricista in Eletricista.query.filter(Eletricista.id.in_(eletricista_ids))}
+    ferramentas_epis = {item.id: item for item in FerramentaEPI.query.filter(FerramentaEPI.id.in_(item_ids))}
+    
+    # Itens com atribuição ativa, também numa única consulta
+    atribuidos = set(db.session.scalars(
+        db.select(AtribuicaoFerramentaEPI.ferramenta_epi_id).where(
+            AtribuicaoFerramentaEPI.ferramenta_epi_id.in_(item_ids),
+            AtribuicaoFerramentaEPI.data_devolucao.is_(None)
+        )
+    ))
+    
+    atribuicoes = []
+    for indice, eletricista_id, ferramenta_epi_id, observacao in validos:
+        if eletricista_id not in eletricistas:
+            erros.append(erro_item(indice, 'Eletricista não encontrado'))
+        elif ferramenta_epi_id not in ferramentas_epis:
+            erros.append(erro_item(indice, 'Ferramenta/EPI não encontrado'))
+        elif ferramenta_epi_id in atribuidos:
+            # Inclui o mesmo item repetido dentro do lote
+            erros.append(erro_item(indice, ERRO_ITEM_ATRIBUIDO))
+        else:
+            atribuidos.add(ferramenta_epi_id)
+            atribuicoes.append(AtribuicaoFerramentaEPI(
+                eletricista_id=eletricista_id,
+                ferramenta_epi_id=ferramenta_epi_id,
+                observacao=observacao
+            ))
+    
+    # Todo o lote numa única transação
+    db.session.add_all(atribuicoes)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # Algum item foi atribuído por outra requisição depois da verificação
+        db.session.rollback()
+        return jsonify({'error': 'Um ou mais itens foram atribuídos por outra requisição, tente novamente'}), 409
+    criados = serializar_atribuicoes(atribuicoes)
+    db.session.commit()
+    
+    erros.sort(key=lambda erro: erro['indice'])
+    return resposta_lote(criados, erros)
+
 @ferramenta_epi_bp.route('/atribuicoes/<int:atribuicao_id>/devolver', methods=['PUT'])
 @require_auth
 def devolver_atribuicao(atribuicao_id):
@@ -127,9 +256,69 @@ def devolver_atribuicao(atribuicao_id):
     
     return jsonify(atribuicao.to_dict())
 
+@ferramenta_epi_bp.route('/atribuicoes/devolver', methods=['PUT'])
+@require_auth
+def devolver_atribuicoes():
+    """Devolve de uma vez as atribuições em aberto de eletricistas ou uma lista de atribuições"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Envie um objeto JSON'}), 400
+    
+    for campo in ('eletricista_ids', 'atribuicao_ids'):
+        if data.get(campo) is not None:
+            if not isinstance(data[campo], list):
+                return jsonify({'error': f'{campo} deve ser uma lista'}), 400
+            if len(data[campo]) > TAMANHO_MAXIMO_LOTE:
+                return jsonify({'error': f'Máximo de {TAMANHO_MAXIMO_LOTE} IDs por requisição'}), 400
+    
+    filtros = [AtribuicaoFerramentaEPI.data_devolucao.is_(None)]
+    atribuicao_ids = None
+    try:
+        if data.get('eletricista_id'):
+            filtros.append(AtribuicaoFerramentaEPI.eletricista_id == int(data['eletricista_id']))
+        elif data.get('eletricista_ids'):
+            eletricista_ids = [int(eletricista_id) for eletricista_id in data['eletricista_ids']]
+            filtros.append(AtribuicaoFerramentaEPI.eletricista_id.in_(eletricista_ids))
+        elif data.get('atribuicao_ids'):
+            atribuicao_ids = [int(atribuicao_id) for atribuicao_id in data['atribuicao_ids']]
+            filtros.append(AtribuicaoFerramentaEPI.id.in_(atribuicao_ids))
+        else:
+            return jsonify({'error': 'Informe eletricista_id, eletricista_ids ou atribuicao_ids'}), 400
+    except (TypeError, ValueError):
+        return jsonify({'error': 'IDs devem ser números'}), 400
+    
+    # Um único UPDATE para todas as atribuições, com a mesma data de devolução
+    data_devolucao = datetime.utcnow()
+    valores = {'data_devolucao': data_devolucao}
+    if 'observacao' in data:
+        valores['observacao'] = data['observacao']
+    
+    devolvidas_ids = db.session.scalars(
+        db.update(AtribuicaoFerramentaEPI)
+        .where(*filtros)
+        .values(**valores)
+        .returning(AtribuicaoFerramentaEPI.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    
+    devolvidas = serializador_atribuicoes(serializador_atribuicoes.query().filter(
+        AtribuicaoFerramentaEPI.id.in_(devolvidas_ids)
+    ).order_by(AtribuicaoFerramentaEPI.id))
+    
+    resultado = {
+        'data_devolucao': data_devolucao.isoformat(),
+        'devolvidas': devolvidas
+    }
+    if atribuicao_ids is not None:
+        # Atribuições pedidas que não existem ou já estavam devolvidas
+        resultado['nao_devolvidas'] = sorted(set(atribuicao_ids) - set(devolvidas_ids))
+    return jsonify(resultado)
+
 @ferramenta_epi_bp.route('/atribuicoes/<int:atribuicao_id>', methods=['GET'])
 @require_auth
+@condicional(*TABELAS_ATRIBUICOES)
 def get_atribuicao(atribuicao_id):
-    atribuicao = AtribuicaoFerramentaEPI.query.get_or_404(atribuicao_id)
+    atribuicao = carregar_atribuicoes(AtribuicaoFerramentaEPI.query).filter_by(id=atribuicao_id).first_or_404()
     return jsonify(atribuicao.to_dict())
 
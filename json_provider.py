@@ -0,0 +1,34 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+# JSON_PROVIDER=orjson (padrão) usa o orjson quando está instalado; sem ele,
+# ou com JSON_PROVIDER=padrao, fica o provider padrão do Flask (json da stdlib).
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Provider do Flask sobre o orjson.
+
+    Tipos que o orjson não conhece (Decimal, UUID...) passam pelo mesmo
+    default do provider padrão. As chaves não são ordenadas e o texto sai
+    em UTF-8, sem escapes \\uXXXX.
+    """
+    opcoes = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.opcoes).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.opcoes), mimetype=self.mimetype
+        )
+
+def configurar_json(app):
+    if app.config.get('JSON_PROVIDER', 'orjson') == 'orjson' and orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,32 @@
+from flask import jsonify, request
+
+# Máximo de itens aceitos por requisição nas rotas /bulk
+TAMANHO_MAXIMO_LOTE = 500
+
+class LoteInvalido(ValueError):
+    pass
+
+def ler_lote():
+    """Lê o corpo de uma rota /bulk: uma lista JSON de objetos"""
+    itens = request.get_json(silent=True)
+    if not isinstance(itens, list) or not itens:
+        raise LoteInvalido('Envie uma lista com ao menos um item')
+    if len(itens) > TAMANHO_MAXIMO_LOTE:
+        raise LoteInvalido(f'Máximo de {TAMANHO_MAXIMO_LOTE} itens por requisição')
+    return itens
+
+def resposta_lote(criados, erros):
+    """Resposta das rotas /bulk com os itens criados e os erros por índice do item enviado.
+
+    201 se tudo foi criado, 207 se parte falhou e 400 se nada foi criado.
+    """
+    if not criados:
+        status = 400
+    elif erros:
+        status = 207
+    else:
+        status = 201
+    return jsonify({'criados': criados, 'erros': erros}), status
+
+def erro_item(indice, mensagem):
+    return {'indice': indice, 'error': mensagem}
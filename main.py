@@ -3,104 +3,156 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
-from src.models.user import db, User, Eletricista, FerramentaEPI, Veiculo
+from src.models.user import db
+from src.models.dados_padrao import aplicar_dados_padrao
+from src.models.search_index import criar_indice_busca
+from src.models.alteracoes import criar_gatilhos_exclusao
+from src.models.migrations import aplicar_migracoes, migracoes_pendentes
+from src.models.engine import aplicar_pragmas, configurar_banco
+from src.json_provider import configurar_json
+from src.compressao import configurar_compressao
+from src.routes.estaticos import configurar_estaticos
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.eletricista import eletricista_bp
 from src.routes.ferramenta_epi import ferramenta_epi_bp
 from src.routes.veiculo import veiculo_bp
 from src.routes.export import export_bp
+from src.routes.export_jobs import export_jobs_bp
+from src.routes.dashboard import dashboard_bp
+from src.routes.sincronizacao import sincronizacao_bp
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+# Configurar banco de dados
+db_path = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
 
-# Configurar CORS para permitir requisições do frontend
-CORS(app, supports_credentials=True)
+def create_app(config=None):
+    """Cria a aplicação. `config` sobrescreve os valores lidos do ambiente.
 
-# Registrar blueprints
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(auth_bp, url_prefix='/api')
-app.register_blueprint(eletricista_bp, url_prefix='/api')
-app.register_blueprint(ferramenta_epi_bp, url_prefix='/api')
-app.register_blueprint(veiculo_bp, url_prefix='/api')
-app.register_blueprint(export_bp, url_prefix='/api')
+    Não toca no banco nem cria arquivos: o diretório do banco, o schema e os
+    dados padrão ficam em inicializar_banco().
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
-# Configurar banco de dados
-db_path = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
-os.makedirs(os.path.dirname(db_path), exist_ok=True)
-
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-
-def create_default_data():
-    """Cria dados padrão no banco de dados"""
-    # Criar usuário admin padrão
-    admin_user = User.query.filter_by(username='admin').first()
-    if not admin_user:
-        admin_user = User(username='admin', permissao='admin')
-        admin_user.set_password('admin123')
-        db.session.add(admin_user)
-    
-    # Criar ferramentas padrão
-    ferramentas_padrao = [
-        'Alicate Universal', 'Chave de Fenda', 'Chave Phillips', 'Multímetro', 
-        'Alicate Amperímetro', 'Furadeira', 'Parafusadeira', 'Morsa', 'Martelo', 'Chave Inglesa'
-    ]
-    
-    for nome in ferramentas_padrao:
-        ferramenta = FerramentaEPI.query.filter_by(nome=nome, tipo='Ferramenta').first()
-        if not ferramenta:
-            ferramenta = FerramentaEPI(nome=nome, tipo='Ferramenta')
-            db.session.add(ferramenta)
-    
-    # Criar EPIs padrão
-    epis_padrao = [
-        'Capacete de Segurança', 'Óculos de Proteção', 'Luvas Isolantes', 'Botina de Segurança',
-        'Cinto de Segurança', 'Talabarte', 'Uniforme NR-10', 'Protetor Auricular', 
-        'Máscara de Proteção', 'Detector de Tensão'
-    ]
-    
-    for nome in epis_padrao:
-        epi = FerramentaEPI.query.filter_by(nome=nome, tipo='EPI').first()
-        if not epi:
-            epi = FerramentaEPI(nome=nome, tipo='EPI')
-            db.session.add(epi)
-    
-    # Criar veículos padrão
-    veiculos_padrao = ['VAN-001', 'VAN-002', 'CAMINHÃO-001', 'PICKUP-001', 'UTILITÁRIO-001']
-    
-    for identificacao in veiculos_padrao:
-        veiculo = Veiculo.query.filter_by(identificacao=identificacao).first()
-        if not veiculo:
-            veiculo = Veiculo(identificacao=identificacao)
-            db.session.add(veiculo)
-    
-    db.session.commit()
-
-with app.app_context():
-    db.create_all()
-    create_default_data()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    # JSON das respostas: orjson quando instalado (JSON_PROVIDER=padrao volta ao json da stdlib)
+    app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER', 'orjson')
 
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f"sqlite:///{db_path}")
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5002, debug=True)
+    # Jobs de exportação em segundo plano (PDF/Excel renderizados num pool de processos)
+    app.config['EXPORT_JOBS_DIR'] = os.environ.get('EXPORT_JOBS_DIR', os.path.join(os.path.dirname(db_path), 'exports'))
+    app.config['EXPORT_JOBS_WORKERS'] = int(os.environ.get('EXPORT_JOBS_WORKERS', 2))
+    app.config['EXPORT_JOBS_MAX_PENDENTES'] = int(os.environ.get('EXPORT_JOBS_MAX_PENDENTES', 20))
+    app.config['EXPORT_JOBS_TTL'] = int(os.environ.get('EXPORT_JOBS_TTL', 3600))
+
+    # Cache em memória de eletricistas, ferramentas/EPIs e veículos (ver src/models/cache_referencias.py)
+    app.config['REFERENCIAS_CACHE_TAMANHO'] = int(os.environ.get('REFERENCIAS_CACHE_TAMANHO', 1000))
+    app.config['REFERENCIAS_CACHE_TTL'] = int(os.environ.get('REFERENCIAS_CACHE_TTL', 300))
+    # Com vários workers, confere versao_tabela a cada requisição para ver alterações dos outros processos
+    app.config['REFERENCIAS_CACHE_VERSAO'] = os.environ.get('REFERENCIAS_CACHE_VERSAO', '0') == '1'
+
+    # Hash de senhas (ver src/models/senhas.py): método/custo e pool de verificação no login
+    app.config['SENHA_HASH_METODO'] = os.environ.get('SENHA_HASH_METODO', 'scrypt')
+    app.config['SENHA_HASH_WORKERS'] = int(os.environ.get('SENHA_HASH_WORKERS', 0)) or None
+    app.config['SENHA_HASH_MAX_PENDENTES'] = int(os.environ.get('SENHA_HASH_MAX_PENDENTES', 32))
+
+    # Usuário admin, ferramentas/EPIs e veículos criados na inicialização (ver src/models/dados_padrao.py)
+    app.config['DADOS_PADRAO'] = os.environ.get('DADOS_PADRAO', os.path.join(os.path.dirname(__file__), 'dados_padrao.json'))
+
+    # Compressão das respostas de /api (ver src/compressao.py)
+    app.config['COMPRESSAO'] = os.environ.get('COMPRESSAO', '1') == '1'
+    app.config['COMPRESSAO_MINIMO'] = int(os.environ.get('COMPRESSAO_MINIMO', 1024))
+    for codificacao in ('GZIP', 'BR', 'ZSTD'):
+        if f'COMPRESSAO_NIVEL_{codificacao}' in os.environ:
+            app.config[f'COMPRESSAO_NIVEL_{codificacao}'] = int(os.environ[f'COMPRESSAO_NIVEL_{codificacao}'])
+
+    # Nomes de arquivos do frontend com hash de conteúdo, servidos com cache imutável (ver src/routes/estaticos.py)
+    if 'ESTATICOS_IMUTAVEIS' in os.environ:
+        app.config['ESTATICOS_IMUTAVEIS'] = os.environ['ESTATICOS_IMUTAVEIS']
+
+    # Feed de alterações (ver src/routes/sincronizacao.py): segundos de sobreposição entre tokens
+    app.config['ALTERACOES_MARGEM'] = int(os.environ.get('ALTERACOES_MARGEM', 5))
+
+    # Migrações de schema na inicialização (desative para aplicar só via `flask db-upgrade`)
+    app.config['DB_AUTO_MIGRATE'] = os.environ.get('DB_AUTO_MIGRATE', '1') == '1'
+
+    if config:
+        app.config.update(config)
 
+    configurar_json(app)
+    configurar_compressao(app)
+
+    # Configurar CORS para permitir requisições do frontend
+    CORS(app, supports_credentials=True)
+
+    # Registrar blueprints
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(auth_bp, url_prefix='/api')
+    app.register_blueprint(eletricista_bp, url_prefix='/api')
+    app.register_blueprint(ferramenta_epi_bp, url_prefix='/api')
+    app.register_blueprint(veiculo_bp, url_prefix='/api')
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(export_jobs_bp, url_prefix='/api')
+    app.register_blueprint(dashboard_bp, url_prefix='/api')
+    app.register_blueprint(sincronizacao_bp, url_prefix='/api')
+
+    # Perfil do SQLite (WAL, busy_timeout, cache...) e pool de conexões, ajustáveis por variáveis de ambiente
+    configurar_banco(app)
+    db.init_app(app)
+    with app.app_context():
+        # Só registra o listener; o índice FTS é detectado na primeira busca (ver search_index.py)
+        aplicar_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS'))
+
+    # Frontend compilado: manifesto da pasta static e fallback da SPA para o index.html
+    configurar_estaticos(app)
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Cria o schema e os dados padrão (rodar antes de iniciar os workers)"""
+        inicializar_banco(app)
+        print('Banco de dados inicializado')
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade():
+        """Aplica as migrações pendentes do banco de dados"""
+        pendentes = migracoes_pendentes()
+        aplicadas = aplicar_migracoes()
+        for versao, descricao in pendentes:
+            if versao in aplicadas:
+                print(f'Migração {versao} aplicada: {descricao}')
+        if not aplicadas:
+            print('Banco de dados já está atualizado')
+
+    return app
+
+def inicializar_banco(app):
+    """Schema, migrações, índice de busca e dados padrão.
+
+    Roda uma única vez por implantação, no processo principal antes de
+    iniciar os workers (src/serve.py, `flask init-db` ou o servidor de
+    desenvolvimento), nunca como efeito colateral do import.
+    """
+    if app.config['SQLALCHEMY_DATABASE_URI'] == f'sqlite:///{db_path}':
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    with app.app_context():
+        db.create_all()
+        if app.config['DB_AUTO_MIGRATE']:
+            aplicar_migracoes()
+        criar_indice_busca()
+        # Também com DB_AUTO_MIGRATE=0, para bancos novos criados pelo create_all()
+        criar_gatilhos_exclusao()
+        aplicar_dados_padrao(app.config['DADOS_PADRAO'])
+        # As conexões abertas aqui não podem ser herdadas pelos workers no fork
+        db.session.remove()
+        db.engine.dispose()
+
+
+if __name__ == '__main__':
+    # Servidor de desenvolvimento; em produção use src/serve.py
+    app = create_app()
+    inicializar_banco(app)
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5002)), debug=True)
@@ -0,0 +1,135 @@
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db
+from src.models.alteracoes import AGORA_SQLITE, criar_gatilhos_exclusao
+
+# Migrações versionadas e só para frente. O db.create_all() cria as tabelas
+# de um banco novo já no formato atual dos modelos; as migrações levam um
+# banco existente até esse mesmo formato sem recriá-lo. Por isso cada
+# migração deve ser idempotente (IF NOT EXISTS) e nunca deve ser alterada
+# depois de publicada: mudanças novas entram como uma nova versão.
+
+def migracao_0001_indices(conexao):
+    """Índices das colunas usadas em filtros, joins e na paginação"""
+    indices = [
+        ('ix_atribuicao_ferramenta_epi_item_devolucao', 'atribuicao_ferramenta_epi', 'ferramenta_epi_id, data_devolucao'),
+        ('ix_atribuicao_ferramenta_epi_data_retirada_id', 'atribuicao_ferramenta_epi', 'data_retirada, id'),
+        ('ix_atribuicao_ferramenta_epi_eletricista_id', 'atribuicao_ferramenta_epi', 'eletricista_id'),
+        ('ix_servico_externo_data_hora_saida_id', 'servico_externo', 'data_hora_saida, id'),
+        ('ix_servico_externo_colaborador_id', 'servico_externo', 'colaborador_id'),
+        ('ix_servico_externo_veiculo_id', 'servico_externo', 'veiculo_id'),
+        ('ix_material_servico_externo_servico_externo_id', 'material_servico_externo', 'servico_externo_id'),
+        ('ix_checklist_cinto_servico_externo_id', 'checklist_cinto', 'servico_externo_id'),
+        ('ix_checklist_escada_servico_externo_id', 'checklist_escada', 'servico_externo_id'),
+        ('ix_eletricista_data_criacao_id', 'eletricista', 'data_criacao, id'),
+        ('ix_ferramenta_epi_data_criacao_id', 'ferramenta_epi', 'data_criacao, id'),
+        ('ix_veiculo_data_criacao_id', 'veiculo', 'data_criacao, id')
+    ]
+    for nome, tabela, colunas in indices:
+        conexao.execute(text(f'CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({colunas})'))
+
+def migracao_0002_atribuicao_aberta_unica(conexao):
+    """Índice único parcial: no máximo uma atribuição em aberto por ferramenta/EPI"""
+    duplicados = conexao.execute(text(
+        'SELECT ferramenta_epi_id FROM atribuicao_ferramenta_epi '
+        'WHERE data_devolucao IS NULL GROUP BY ferramenta_epi_id HAVING count(*) > 1'
+    )).scalars().all()
+    if duplicados:
+        raise RuntimeError(
+            'Ferramentas/EPIs com mais de uma atribuição em aberto: '
+            f'{", ".join(str(item_id) for item_id in duplicados)}. '
+            'Registre a devolução das atribuições duplicadas antes de migrar.'
+        )
+    conexao.execute(text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_atribuicao_ferramenta_epi_item_aberto '
+        'ON atribuicao_ferramenta_epi (ferramenta_epi_id) WHERE data_devolucao IS NULL'
+    ))
+
+def migracao_0003_feed_alteracoes(conexao):
+    """data_atualizacao indexada nas tabelas do feed, lápides de exclusão e seus gatilhos"""
+    # Valor inicial: a data mais recente conhecida de cada registro
+    tabelas = [
+        ('eletricista', 'data_criacao'),
+        ('ferramenta_epi', 'data_criacao'),
+        ('atribuicao_ferramenta_epi', 'coalesce(data_devolucao, data_retirada)'),
+        ('veiculo', 'data_criacao'),
+        ('servico_externo', 'data_hora_saida')
+    ]
+    for tabela, inicial in tabelas:
+        colunas = {linha[1] for linha in conexao.execute(text(f'PRAGMA table_info("{tabela}")'))}
+        if 'data_atualizacao' not in colunas:
+            conexao.execute(text(f'ALTER TABLE "{tabela}" ADD COLUMN data_atualizacao DATETIME'))
+        conexao.execute(text(
+            f'UPDATE "{tabela}" SET data_atualizacao = coalesce({inicial}, {AGORA_SQLITE}) '
+            'WHERE data_atualizacao IS NULL'
+        ))
+        conexao.execute(text(
+            f'CREATE INDEX IF NOT EXISTS ix_{tabela}_data_atualizacao_id ON "{tabela}" (data_atualizacao, id)'
+        ))
+
+    conexao.execute(text(
+        'CREATE TABLE IF NOT EXISTS registro_excluido ('
+        'id INTEGER PRIMARY KEY, '
+        'tabela VARCHAR(100) NOT NULL, '
+        'registro_id INTEGER NOT NULL, '
+        'data_exclusao DATETIME NOT NULL)'
+    ))
+    conexao.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_registro_excluido_data_exclusao_id ON registro_excluido (data_exclusao, id)'
+    ))
+    criar_gatilhos_exclusao(conexao)
+
+# (versão, descrição, função) em ordem crescente de versão
+MIGRACOES = [
+    (1, 'Índices de filtros, joins e paginação', migracao_0001_indices),
+    (2, 'Uma atribuição em aberto por ferramenta/EPI', migracao_0002_atribuicao_aberta_unica),
+    (3, 'Feed de alterações: data_atualizacao e lápides de exclusão', migracao_0003_feed_alteracoes)
+]
+
+def criar_tabela_versoes(conexao):
+    conexao.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'versao INTEGER PRIMARY KEY, '
+        'descricao VARCHAR(200) NOT NULL, '
+        'aplicada_em DATETIME NOT NULL)'
+    ))
+
+def versoes_aplicadas(conexao):
+    return {linha[0] for linha in conexao.execute(text('SELECT versao FROM schema_migrations'))}
+
+def aplicar_migracoes(engine=None):
+    """Aplica as migrações pendentes, cada uma na sua transação.
+
+    Retorna as versões aplicadas nesta chamada. Se outro processo aplicar a
+    mesma versão ao mesmo tempo, o registro duplicado desfaz a transação
+    deste processo e a versão é ignorada.
+    """
+    engine = engine or db.engine
+    with engine.begin() as conexao:
+        criar_tabela_versoes(conexao)
+        aplicadas = versoes_aplicadas(conexao)
+
+    novas = []
+    for versao, descricao, migracao in MIGRACOES:
+        if versao in aplicadas:
+            continue
+        try:
+            with engine.begin() as conexao:
+                migracao(conexao)
+                conexao.execute(
+                    text('INSERT INTO schema_migrations (versao, descricao, aplicada_em) '
+                         'VALUES (:versao, :descricao, :aplicada_em)'),
+                    {'versao': versao, 'descricao': descricao, 'aplicada_em': datetime.utcnow()}
+                )
+        except IntegrityError:
+            continue
+        novas.append(versao)
+    return novas
+
+def migracoes_pendentes(engine=None):
+    engine = engine or db.engine
+    with engine.begin() as conexao:
+        criar_tabela_versoes(conexao)
+        aplicadas = versoes_aplicadas(conexao)
+    return [(versao, descricao) for versao, descricao, _ in MIGRACOES if versao not in aplicadas]
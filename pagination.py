@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import jsonify, request
+from sqlalchemy import literal, or_, tuple_
+from src.routes.streaming import formato_stream, transmitir
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+class CursorInvalido(ValueError):
+    pass
+
+def encode_cursor(data, registro_id):
+    """Codifica a posição (data, id) do último registro de uma página"""
+    payload = json.dumps([data.isoformat() if data else None, registro_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decodifica um cursor gerado por encode_cursor"""
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        data, registro_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        data = datetime.fromisoformat(data) if data else None
+        if not isinstance(registro_id, int):
+            raise ValueError
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise CursorInvalido('Cursor inválido')
+    return data, registro_id
+
+def paginacao_solicitada():
+    return 'limit' in request.args or 'after' in request.args
+
+def ler_limite():
+    limite = request.args.get('limit', LIMITE_PADRAO)
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        raise CursorInvalido('Parâmetro limit inválido')
+    if limite < 1 or limite > LIMITE_MAXIMO:
+        raise CursorInvalido(f'Parâmetro limit deve estar entre 1 e {LIMITE_MAXIMO}')
+    return limite
+
+def paginar(query, coluna_data, coluna_id):
+    """Aplica paginação por cursor (keyset) ordenada por (data, id) decrescente.
+
+    O filtro usa comparação de tupla sobre o índice (data, id), então o custo
+    de cada página não depende da profundidade no histórico (sem OFFSET).
+    Registros sem data vêm por último (no SQLite, NULL é o menor valor) e
+    são paginados só pelo id. Retorna a lista de registros da página e o
+    cursor da próxima.
+    """
+    limite = ler_limite()
+    query = query.order_by(coluna_data.desc(), coluna_id.desc())
+
+    cursor = request.args.get('after')
+    if cursor:
+        data, ultimo_id = decode_cursor(cursor)
+        if data is None:
+            # A comparação de tupla com NULL nunca é verdadeira
+            query = query.filter(coluna_data.is_(None), coluna_id < ultimo_id)
+        else:
+            # Bind com o tipo da coluna: a data vai no mesmo formato em que está gravada
+            posicao = tuple_(literal(data, coluna_data.type), literal(ultimo_id, coluna_id.type))
+            query = query.filter(or_(tuple_(coluna_data, coluna_id) < posicao, coluna_data.is_(None)))
+
+    registros = query.limit(limite + 1).all()
+    proximo_cursor = None
+    if len(registros) > limite:
+        registros = registros[:limite]
+        ultimo = registros[-1]
+        proximo_cursor = encode_cursor(getattr(ultimo, coluna_data.key), getattr(ultimo, coluna_id.key))
+    return registros, proximo_cursor
+
+def listar(query, coluna_data, coluna_id, serializar):
+    """Responde uma rota de listagem.
+
+    Sem ?limit/?after mantém o formato antigo (lista completa); com eles
+    devolve {'items': [...], 'next_cursor': ...}. Com ?stream envia a lista
+    completa em streaming. `serializar` recebe a lista de registros e
+    devolve a lista de dicionários.
+    """
+    formato = formato_stream()
+    if formato:
+        return transmitir(query, serializar, formato)
+
+    if not paginacao_solicitada():
+        return jsonify(serializar(query.all()))
+
+    try:
+        registros, proximo_cursor = paginar(query, coluna_data, coluna_id)
+    except CursorInvalido as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'items': serializar(registros), 'next_cursor': proximo_cursor})
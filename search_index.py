@@ -0,0 +1,140 @@
+import re
+from sqlalchemy import Integer, and_, bindparam, column, text
+from sqlalchemy.exc import OperationalError
+from src.models.user import db
+
+# Índices de texto completo (FTS5) das colunas usadas nas buscas.
+# São tabelas de conteúdo externo: guardam só o índice e são mantidas
+# pelos triggers abaixo. O tokenizador unicode61 com remove_diacritics
+# faz "multimetro" encontrar "Multímetro".
+INDICES = {
+    'eletricista': ['nome'],
+    'ferramenta_epi': ['nome'],
+    'user': ['username'],
+    'servico_externo': ['destino', 'empresa_atendida']
+}
+
+TOKENIZADOR = 'unicode61 remove_diacritics 2'
+
+# Definido por criar_indice_busca/detectar_indice_busca; sem FTS5 as buscas usam ILIKE.
+# None: ainda não verificado neste processo (ver indice_disponivel)
+_disponivel = None
+
+def tabela_fts(tabela):
+    return f'{tabela}_fts'
+
+def criar_indice_busca():
+    """Cria as tabelas FTS5 e os triggers de sincronização, se ainda não existirem.
+
+    Uma tabela criada agora é preenchida a partir das linhas já existentes.
+    """
+    global _disponivel
+    if db.engine.dialect.name != 'sqlite':
+        _disponivel = False
+        return
+
+    try:
+        with db.engine.begin() as conexao:
+            existentes = {linha[0] for linha in conexao.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table'")
+            )}
+            for tabela, colunas in INDICES.items():
+                fts = tabela_fts(tabela)
+                for comando in ddl_indice(tabela, colunas):
+                    conexao.execute(text(comando))
+                if fts not in existentes:
+                    conexao.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    except OperationalError:
+        # SQLite compilado sem FTS5: as buscas continuam com ILIKE
+        _disponivel = False
+        return
+    _disponivel = True
+
+def detectar_indice_busca(conexao):
+    """Verifica se os índices existem no banco (processos que não os criaram, como os jobs de exportação)"""
+    global _disponivel
+    if conexao.dialect.name != 'sqlite':
+        _disponivel = False
+        return
+    nomes = [tabela_fts(tabela) for tabela in INDICES]
+    encontrados = conexao.execute(
+        text("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN :nomes")
+        .bindparams(bindparam('nomes', expanding=True)),
+        {'nomes': nomes}
+    ).scalar()
+    _disponivel = encontrados == len(nomes)
+
+def indice_disponivel():
+    """Se os índices FTS5 podem ser usados; workers que não rodaram
+    criar_indice_busca() verificam o banco na primeira busca"""
+    if _disponivel is None:
+        detectar_indice_busca(db.session.connection())
+    return _disponivel
+
+def ddl_indice(tabela, colunas):
+    fts = tabela_fts(tabela)
+    lista = ', '.join(colunas)
+    novos = ', '.join(f'new.{coluna}' for coluna in colunas)
+    antigos = ', '.join(f'old.{coluna}' for coluna in colunas)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {lista}, content='{tabela}', content_rowid='id', tokenize='{TOKENIZADOR}'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "{tabela}" BEGIN
+            INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {novos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "{tabela}" BEGIN
+            INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {lista} ON "{tabela}" BEGIN
+            INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});
+            INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {novos});
+        END"""
+    ]
+
+def expressao_fts(termos):
+    """Monta a consulta FTS5: cada palavra vira um prefixo e todas precisam casar.
+
+    {'destino': 'são paulo'} -> 'destino : ("são"* AND "paulo"*)'
+    """
+    partes = []
+    for coluna, texto in termos.items():
+        palavras = re.findall(r'\w+', texto or '')
+        if palavras:
+            partes.append(f'{coluna} : (' + ' AND '.join(f'"{palavra}"*' for palavra in palavras) + ')')
+    return ' AND '.join(partes) or None
+
+def criterio_busca(modelo, termos):
+    """Critério que restringe `modelo` às linhas cujas colunas contêm os termos.
+
+    `termos` mapeia nome da coluna -> texto buscado; termos vazios são
+    ignorados. Retorna None se não houver o que filtrar.
+    """
+    termos = {coluna: texto for coluna, texto in termos.items() if texto}
+    if not termos:
+        return None
+
+    tabela = modelo.__table__.name
+    expressao = expressao_fts(termos)
+    if not indice_disponivel() or tabela not in INDICES or not expressao:
+        return and_(*[getattr(modelo, coluna).ilike(f'%{texto}%') for coluna, texto in termos.items()])
+
+    fts = tabela_fts(tabela)
+    return modelo.id.in_(
+        text(f'SELECT rowid FROM {fts} WHERE {fts} MATCH :busca_{tabela}')
+        .bindparams(bindparam(f'busca_{tabela}', expressao))
+        .columns(column('rowid', Integer))
+    )
+
+def ordem_relevancia(modelo, termos):
+    """Ordenação por relevância (bm25) para os mesmos termos de criterio_busca, ou None"""
+    termos = {coluna: texto for coluna, texto in termos.items() if texto}
+    tabela = modelo.__table__.name
+    expressao = expressao_fts(termos)
+    if not indice_disponivel() or tabela not in INDICES or not expressao:
+        return None
+
+    fts = tabela_fts(tabela)
+    return text(
+        f'(SELECT rank FROM {fts} WHERE {fts} MATCH :busca_{tabela} AND {fts}.rowid = "{tabela}".id)'
+    ).bindparams(bindparam(f'busca_{tabela}', expressao))
@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Hash de senhas com método e custo configuráveis, no formato do werkzeug:
+#
+#   SENHA_HASH_METODO         'scrypt', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000'...
+#   SENHA_HASH_WORKERS        threads que conferem senhas ao mesmo tempo (padrão: núcleos)
+#   SENHA_HASH_MAX_PENDENTES  logins aguardando no pool antes de responder 503
+#
+# O hashlib libera o GIL durante o scrypt/pbkdf2, então o pool limita quantos
+# núcleos um pico de logins ocupa sem travar as demais requisições do worker.
+# Hashes gravados com outro método/custo são refeitos no próximo login.
+METODO_PADRAO = 'scrypt'
+MAX_PENDENTES_PADRAO = 32
+
+_executor = None
+_pendentes = 0
+_lock = threading.Lock()
+
+class FilaSenhasCheia(Exception):
+    pass
+
+def metodo_configurado():
+    if has_app_context():
+        return current_app.config.get('SENHA_HASH_METODO', METODO_PADRAO)
+    return METODO_PADRAO
+
+@lru_cache(maxsize=None)
+def parametros(metodo):
+    """Método com todos os parâmetros, como o werkzeug grava no hash ('scrypt' -> 'scrypt:32768:8:1')"""
+    return generate_password_hash('', metodo).split('$', 1)[0]
+
+def gerar_hash(senha, metodo=None):
+    return generate_password_hash(senha, metodo or metodo_configurado())
+
+def precisa_rehash(password_hash, metodo=None):
+    return password_hash.split('$', 1)[0] != parametros(metodo or metodo_configurado())
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('SENHA_HASH_WORKERS') or os.cpu_count() or 1,
+                thread_name_prefix='senhas'
+            )
+        return _executor
+
+def executar(funcao, *args):
+    """Roda funcao(*args) no pool e espera o resultado; FilaSenhasCheia se o pool estiver lotado"""
+    global _pendentes
+    executor = get_executor()
+    with _lock:
+        if _pendentes >= current_app.config.get('SENHA_HASH_MAX_PENDENTES', MAX_PENDENTES_PADRAO):
+            raise FilaSenhasCheia()
+        _pendentes += 1
+    try:
+        return executor.submit(funcao, *args).result()
+    finally:
+        with _lock:
+            _pendentes -= 1
+
+def verificar_senha(password_hash, senha):
+    return executar(check_password_hash, password_hash, senha)
@@ -0,0 +1,264 @@
+from sqlalchemy import DateTime
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+from src.models.user import (db, AtribuicaoFerramentaEPI, ChecklistCinto, ChecklistEscada, Eletricista, FerramentaEPI,
+                             MaterialServicoExterno, ServicoExterno, User, Veiculo)
+
+# Serialização em lote: os relacionamentos usados pelos payloads são
+# carregados antecipadamente (joined para muitos-para-um, selectin para
+# coleções), então uma lista inteira custa um número fixo de SELECTs em vez
+# de várias consultas preguiçosas por registro.
+
+# Tabelas lidas por cada payload, para as ETags (src/routes/condicional.py)
+TABELAS_ATRIBUICOES = ('atribuicao_ferramenta_epi', 'eletricista', 'ferramenta_epi')
+TABELAS_SERVICOS = ('servico_externo', 'user', 'veiculo', 'material_servico_externo',
+                    'checklist_cinto', 'checklist_escada')
+
+def carregar_atribuicoes(query, com_join=False):
+    """Carrega eletricista e ferramenta/EPI junto com as atribuições.
+
+    Use com_join=True quando a query já faz join com Eletricista e
+    FerramentaEPI (rotas de busca), para reaproveitar esses joins.
+    """
+    if com_join:
+        return query.options(
+            contains_eager(AtribuicaoFerramentaEPI.eletricista),
+            contains_eager(AtribuicaoFerramentaEPI.ferramenta_epi)
+        )
+    return query.options(
+        joinedload(AtribuicaoFerramentaEPI.eletricista),
+        joinedload(AtribuicaoFerramentaEPI.ferramenta_epi)
+    )
+
+def carregar_servicos(query, detalhes=True, com_join=False):
+    """Carrega colaborador, veículo e, se detalhes=True, materiais e checklists.
+
+    Use com_join=True quando a query já faz join com User.
+    """
+    colaborador = contains_eager(ServicoExterno.colaborador) if com_join else joinedload(ServicoExterno.colaborador)
+    opcoes = [colaborador, joinedload(ServicoExterno.veiculo)]
+    if detalhes:
+        opcoes += [
+            selectinload(ServicoExterno.materiais),
+            selectinload(ServicoExterno.checklist_cinto),
+            selectinload(ServicoExterno.checklist_escada)
+        ]
+    return query.options(*opcoes)
+
+def serializar_atribuicoes(atribuicoes):
+    return [atribuicao.to_dict() for atribuicao in atribuicoes]
+
+def serializar_servico(servico):
+    """Serializa um serviço externo com materiais e checklists"""
+    servico_dict = servico.to_dict()
+    servico_dict['materiais'] = [material.to_dict() for material in servico.materiais]
+    if servico.checklist_cinto:
+        servico_dict['checklist_cinto'] = servico.checklist_cinto.to_dict()
+    if servico.checklist_escada:
+        servico_dict['checklist_escada'] = servico.checklist_escada.to_dict()
+    return servico_dict
+
+def serializar_servicos(servicos):
+    return [serializar_servico(servico) for servico in servicos]
+
+class CampoInvalido(ValueError):
+    pass
+
+class SerializadorColunas:
+    """Serializa linhas de um SELECT de colunas direto para dicionários.
+
+    Gera o mesmo payload do to_dict() sem montar objetos do ORM: a consulta
+    traz só as colunas do payload (com os joins necessários) e cada linha
+    vira dicionário por zip com os nomes, convertendo só as datas.
+    """
+    def __init__(self, campos, juntar=None, chaves=('id',), ocultos=()):
+        # campos: lista de (nome no payload, coluna), na ordem do to_dict().
+        # chaves: campos sempre selecionados, mesmo fora de ?fields (id e a
+        # data da paginação por cursor); ficam em `ocultos` quando não pedidos
+        self.campos = campos
+        self.juntar = juntar
+        self.chaves = chaves
+        self.nomes = [nome for nome, _ in campos]
+        self.colunas = [coluna.label(nome) for nome, coluna in list(campos) + list(ocultos)]
+        self.converter = self._conversor()
+        self.parciais = {}
+
+    def _conversor(self):
+        # zip para no último campo do payload: as colunas ocultas ficam de fora
+        nomes = tuple(self.nomes)
+        datas = [(indice, nome) for indice, (nome, coluna) in enumerate(self.campos) if isinstance(coluna.type, DateTime)]
+
+        def converter(linha):
+            item = dict(zip(nomes, linha))
+            for indice, nome in datas:
+                valor = linha[indice]
+                if valor is not None:
+                    item[nome] = valor.isoformat()
+            return item
+        return converter
+
+    def selecionar(self, nomes=None, includes=None):
+        """Serializador só com os campos pedidos, na ordem do payload completo"""
+        if includes:
+            raise CampoInvalido(f'include não disponível: {", ".join(sorted(includes))}')
+        if nomes is None:
+            return self
+        desconhecidos = set(nomes) - set(self.nomes)
+        if desconhecidos:
+            raise CampoInvalido(f'Campos inválidos: {", ".join(sorted(desconhecidos))}')
+        chave = frozenset(nomes)
+        if chave not in self.parciais:
+            self.parciais[chave] = SerializadorColunas(
+                [campo for campo in self.campos if campo[0] in chave],
+                juntar=self.juntar,
+                chaves=self.chaves,
+                ocultos=[campo for campo in self.campos if campo[0] in self.chaves and campo[0] not in chave]
+            )
+        return self.parciais[chave]
+
+    def query(self):
+        query = db.session.query(*self.colunas)
+        return self.juntar(query) if self.juntar else query
+
+    def __call__(self, linhas):
+        converter = self.converter
+        return [converter(linha) for linha in linhas]
+
+class SerializadorServicos:
+    """Serviços externos por colunas, com materiais e checklists opcionais (?include=).
+
+    Cada include pedido custa uma consulta por lote, filtrada pelos ids dos
+    serviços do lote, como o selectinload do caminho pelo ORM.
+    """
+    def __init__(self, base, includes):
+        # includes: nome -> (serializador, modelo, lista?) na ordem do payload
+        self.base = base
+        self.includes = includes
+        self.nomes = base.nomes
+        self.parciais = {}
+
+    def selecionar(self, nomes=None, includes=None):
+        includes = includes or ()
+        desconhecidos = set(includes) - set(self.includes)
+        if desconhecidos:
+            raise CampoInvalido(f'include inválido: {", ".join(sorted(desconhecidos))}')
+        base = self.base.selecionar(nomes)
+        chave = (base, frozenset(includes))
+        if chave not in self.parciais:
+            self.parciais[chave] = SerializadorServicos(
+                base, {nome: incluido for nome, incluido in self.includes.items() if nome in includes}
+            )
+        return self.parciais[chave]
+
+    def query(self):
+        return self.base.query()
+
+    def __call__(self, linhas):
+        itens = self.base(linhas)
+        if not self.includes or not itens:
+            return itens
+        posicoes = {linha.id: item for linha, item in zip(linhas, itens)}
+        for nome, (serializador, modelo, lista) in self.includes.items():
+            if lista:
+                for item in itens:
+                    item[nome] = []
+            relacionados = serializador.query().filter(
+                modelo.servico_externo_id.in_(list(posicoes))
+            ).order_by(modelo.id)
+            for relacionado in serializador(relacionados):
+                item = posicoes[relacionado['servico_externo_id']]
+                if lista:
+                    item[nome].append(relacionado)
+                else:
+                    item.setdefault(nome, relacionado)
+        return itens
+
+serializador_eletricistas = SerializadorColunas([
+    ('id', Eletricista.id),
+    ('nome', Eletricista.nome),
+    ('data_criacao', Eletricista.data_criacao)
+], chaves=('id', 'data_criacao'))
+
+serializador_ferramentas_epis = SerializadorColunas([
+    ('id', FerramentaEPI.id),
+    ('nome', FerramentaEPI.nome),
+    ('tipo', FerramentaEPI.tipo),
+    ('data_criacao', FerramentaEPI.data_criacao)
+], chaves=('id', 'data_criacao'))
+
+serializador_veiculos = SerializadorColunas([
+    ('id', Veiculo.id),
+    ('identificacao', Veiculo.identificacao),
+    ('data_criacao', Veiculo.data_criacao)
+], chaves=('id', 'data_criacao'))
+
+# Mesmo payload de User.to_dict(), sem o hash da senha
+serializador_usuarios = SerializadorColunas([
+    ('id', User.id),
+    ('username', User.username),
+    ('permissao', User.permissao),
+    ('data_criacao', User.data_criacao)
+])
+
+serializador_atribuicoes = SerializadorColunas([
+    ('id', AtribuicaoFerramentaEPI.id),
+    ('eletricista_id', AtribuicaoFerramentaEPI.eletricista_id),
+    ('ferramenta_epi_id', AtribuicaoFerramentaEPI.ferramenta_epi_id),
+    ('data_retirada', AtribuicaoFerramentaEPI.data_retirada),
+    ('data_devolucao', AtribuicaoFerramentaEPI.data_devolucao),
+    ('observacao', AtribuicaoFerramentaEPI.observacao),
+    ('eletricista_nome', Eletricista.nome),
+    ('ferramenta_epi_nome', FerramentaEPI.nome),
+    ('ferramenta_epi_tipo', FerramentaEPI.tipo)
+], juntar=lambda query: query.select_from(AtribuicaoFerramentaEPI)
+    .outerjoin(Eletricista, AtribuicaoFerramentaEPI.eletricista_id == Eletricista.id)
+    .outerjoin(FerramentaEPI, AtribuicaoFerramentaEPI.ferramenta_epi_id == FerramentaEPI.id),
+    chaves=('id', 'data_retirada'))
+
+serializador_materiais = SerializadorColunas([
+    ('id', MaterialServicoExterno.id),
+    ('servico_externo_id', MaterialServicoExterno.servico_externo_id),
+    ('nome', MaterialServicoExterno.nome),
+    ('tipo', MaterialServicoExterno.tipo),
+    ('status', MaterialServicoExterno.status),
+    ('observacao_tecnica', MaterialServicoExterno.observacao_tecnica),
+    ('foto_path', MaterialServicoExterno.foto_path)
+])
+
+serializador_checklists_cinto = SerializadorColunas([
+    ('id', ChecklistCinto.id),
+    ('servico_externo_id', ChecklistCinto.servico_externo_id),
+    ('cinto_seguranca_status', ChecklistCinto.cinto_seguranca_status),
+    ('talabarte_status', ChecklistCinto.talabarte_status),
+    ('mosquetao_status', ChecklistCinto.mosquetao_status),
+    ('observacoes', ChecklistCinto.observacoes)
+])
+
+serializador_checklists_escada = SerializadorColunas([
+    ('id', ChecklistEscada.id),
+    ('servico_externo_id', ChecklistEscada.servico_externo_id),
+    ('escada_simples_status', ChecklistEscada.escada_simples_status),
+    ('escada_extensivel_status', ChecklistEscada.escada_extensivel_status),
+    ('degraus_status', ChecklistEscada.degraus_status),
+    ('travas_status', ChecklistEscada.travas_status),
+    ('observacoes', ChecklistEscada.observacoes)
+])
+
+# Sem ?fields nem ?include o payload é o mesmo de serializar_servico(), com
+# materiais e checklists; com qualquer um deles, só os includes pedidos
+serializador_servicos = SerializadorServicos(SerializadorColunas([
+    ('id', ServicoExterno.id),
+    ('colaborador_id', ServicoExterno.colaborador_id),
+    ('veiculo_id', ServicoExterno.veiculo_id),
+    ('destino', ServicoExterno.destino),
+    ('empresa_atendida', ServicoExterno.empresa_atendida),
+    ('data_hora_saida', ServicoExterno.data_hora_saida),
+    ('colaborador_nome', User.username),
+    ('veiculo_identificacao', Veiculo.identificacao)
+], juntar=lambda query: query.select_from(ServicoExterno)
+    .outerjoin(User, ServicoExterno.colaborador_id == User.id)
+    .outerjoin(Veiculo, ServicoExterno.veiculo_id == Veiculo.id),
+    chaves=('id', 'data_hora_saida')), {
+    'materiais': (serializador_materiais, MaterialServicoExterno, True),
+    'checklist_cinto': (serializador_checklists_cinto, ChecklistCinto, False),
+    'checklist_escada': (serializador_checklists_escada, ChecklistEscada, False)
+})
@@ -0,0 +1,64 @@
+"""Servidor de produção: gunicorn com vários workers (processos) e threads.
+
+Inicializa o banco (schema, migrações, índice de busca, dados padrão) uma
+única vez no processo principal e só então cria os workers por fork, já com
+a aplicação carregada (preload).
+
+    python src/serve.py
+    python src/serve.py --workers 4 --threads 8 --bind 0.0.0.0:8000
+
+Variáveis de ambiente: WEB_BIND, WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT.
+"""
+import os
+import sys
+# Mesmo ajuste de caminho do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from gunicorn.app.base import BaseApplication
+from src.main import create_app, inicializar_banco
+
+class Servidor(BaseApplication):
+    def __init__(self, app, opcoes):
+        self.app = app
+        self.opcoes = opcoes
+        super().__init__()
+
+    def load_config(self):
+        for nome, valor in self.opcoes.items():
+            self.cfg.set(nome, valor)
+
+    def load(self):
+        return self.app
+
+def workers_padrao():
+    # Com SQLite as escritas são serializadas; mais processos que isso só disputam o lock
+    return min(2 * (os.cpu_count() or 1) + 1, 8)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bind', default=os.environ.get('WEB_BIND', '0.0.0.0:5002'))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', workers_padrao())))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', 4)))
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('WEB_TIMEOUT', 120)))
+    args = parser.parse_args()
+
+    config = {}
+    if args.workers > 1 and 'REFERENCIAS_CACHE_VERSAO' not in os.environ:
+        # Cada worker tem seu cache; confere versao_tabela para ver as alterações dos outros
+        config['REFERENCIAS_CACHE_VERSAO'] = True
+    app = create_app(config)
+    inicializar_banco(app)
+
+    Servidor(app, {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'accesslog': '-'
+    }).run()
+
+if __name__ == '__main__':
+    main()
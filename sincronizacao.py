@@ -0,0 +1,81 @@
+import base64
+import binascii
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import select
+from src.models.user import (db, AtribuicaoFerramentaEPI, Eletricista, FerramentaEPI, RegistroExcluido,
+                             ServicoExterno, Veiculo)
+from src.routes.auth import require_auth
+from src.routes.condicional import condicional
+from src.models.serializers import (TABELAS_ATRIBUICOES, TABELAS_SERVICOS, serializador_atribuicoes,
+                                    serializador_eletricistas, serializador_ferramentas_epis, serializador_servicos,
+                                    serializador_veiculos)
+
+sincronizacao_bp = Blueprint('sincronizacao', __name__)
+
+# (chave na resposta, modelo, serializador); os itens têm o mesmo formato das rotas de listagem
+RECURSOS = [
+    ('eletricistas', Eletricista, serializador_eletricistas),
+    ('ferramentas_epis', FerramentaEPI, serializador_ferramentas_epis),
+    ('atribuicoes', AtribuicaoFerramentaEPI, serializador_atribuicoes),
+    ('veiculos', Veiculo, serializador_veiculos),
+    ('servicos_externos', ServicoExterno, serializador_servicos)
+]
+
+# O token devolvido fica alguns segundos no passado: uma escrita que pegou o
+# horário antes de outra, mas terminou depois, ainda aparece na próxima
+# chamada. O cliente pode receber o mesmo registro duas vezes, nunca perdê-lo.
+MARGEM_PADRAO = 5
+
+class TokenInvalido(ValueError):
+    pass
+
+def encode_token(instante):
+    return base64.urlsafe_b64encode(instante.isoformat().encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_token(token):
+    try:
+        padding = '=' * (-len(token) % 4)
+        return datetime.fromisoformat(base64.urlsafe_b64decode(token + padding).decode('utf-8'))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise TokenInvalido('Token inválido')
+
+@sincronizacao_bp.route('/alteracoes', methods=['GET'])
+@require_auth
+@condicional(*TABELAS_ATRIBUICOES, *TABELAS_SERVICOS)
+def get_alteracoes():
+    """Registros criados, alterados ou excluídos desde ?since=<token>.
+
+    Sem since devolve as tabelas completas (primeira sincronização). O
+    cliente aplica primeiro as exclusões e depois os registros, e guarda o
+    token da resposta para a próxima chamada.
+    """
+    try:
+        desde = decode_token(request.args['since']) if request.args.get('since') else None
+    except TokenInvalido as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Lido antes das consultas: o que for gravado durante elas entra na próxima
+    margem = current_app.config.get('ALTERACOES_MARGEM', MARGEM_PADRAO)
+    resposta = {'token': encode_token(datetime.utcnow() - timedelta(seconds=margem)), 'completo': desde is None}
+
+    for nome, modelo, serializador in RECURSOS:
+        query = serializador.query()
+        if desde:
+            query = query.filter(modelo.data_atualizacao >= desde)
+        resposta[nome] = serializador(query.order_by(modelo.data_atualizacao, modelo.id))
+
+    excluidos = {nome: [] for nome, _, _ in RECURSOS}
+    if desde:
+        nomes = {modelo.__table__.name: nome for nome, modelo, _ in RECURSOS}
+        lapides = db.session.execute(
+            select(RegistroExcluido.tabela, RegistroExcluido.registro_id)
+            .where(RegistroExcluido.data_exclusao >= desde)
+            .order_by(RegistroExcluido.data_exclusao, RegistroExcluido.id)
+        )
+        for tabela, registro_id in lapides:
+            if tabela in nomes:
+                excluidos[nomes[tabela]].append(registro_id)
+    resposta['excluidos'] = excluidos
+
+    return jsonify(resposta)
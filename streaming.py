@@ -0,0 +1,55 @@
+from itertools import islice
+from flask import Response, current_app, request, stream_with_context
+
+# Modo streaming das listagens e buscas (?stream=1 ou ?stream=ndjson): a
+# consulta é lida do cursor em lotes e cada lote é serializado e enviado
+# antes do próximo, então a memória do worker não cresce com o tamanho da
+# resposta e o primeiro byte sai antes da consulta terminar. Ignora
+# ?limit/?after. Um erro no meio da resposta só pode interromper o corpo,
+# já que o status 200 foi enviado.
+TAMANHO_LOTE = 500
+
+MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson'
+}
+
+def formato_stream():
+    """'json', 'ndjson' ou None conforme o parâmetro stream"""
+    valor = request.args.get('stream', '').lower()
+    if valor in ('1', 'true', 'json'):
+        return 'json'
+    if valor == 'ndjson':
+        return 'ndjson'
+    return None
+
+def em_lotes(query):
+    registros = iter(query.yield_per(TAMANHO_LOTE))
+    while True:
+        lote = list(islice(registros, TAMANHO_LOTE))
+        if not lote:
+            return
+        yield lote
+
+def gerar_array(lotes, serializar):
+    """Um array JSON, enviado em pedaços de um lote cada"""
+    dumps = current_app.json.dumps
+    yield '['
+    separador = ''
+    for lote in lotes:
+        itens = ','.join(dumps(item) for item in serializar(lote))
+        if itens:
+            yield separador + itens
+            separador = ','
+    yield ']'
+
+def gerar_ndjson(lotes, serializar):
+    """Um objeto JSON por linha"""
+    dumps = current_app.json.dumps
+    for lote in lotes:
+        yield ''.join(dumps(item) + '\n' for item in serializar(lote))
+
+def transmitir(query, serializar, formato):
+    """Resposta em streaming; `serializar` recebe um lote de registros e devolve os dicionários"""
+    gerador = gerar_ndjson if formato == 'ndjson' else gerar_array
+    return Response(stream_with_context(gerador(em_lotes(query), serializar)), mimetype=MIMETYPES[formato])
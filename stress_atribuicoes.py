@@ -0,0 +1,93 @@
+"""Teste de estresse: centenas de retiradas simultâneas dos mesmos itens.
+
+Dispara POST /api/atribuicoes em várias threads ao mesmo tempo contra um
+banco temporário e verifica que cada ferramenta/EPI terminou com
+exatamente uma atribuição em aberto (uma resposta 201 por item, o resto 409).
+
+    python src/stress_atribuicoes.py
+    python src/stress_atribuicoes.py --requisicoes 500 --itens 20
+"""
+import os
+import sys
+# Mesmo ajuste de caminho do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import threading
+from collections import Counter
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requisicoes', type=int, default=300)
+    parser.add_argument('--itens', type=int, default=10)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(diretorio, 'stress.db')}"
+    os.environ['EXPORT_JOBS_DIR'] = os.path.join(diretorio, 'exports')
+
+    from src.main import create_app, inicializar_banco
+    from src.models.user import db, AtribuicaoFerramentaEPI, Eletricista, FerramentaEPI
+
+    app = create_app()
+    inicializar_banco(app)
+    with app.app_context():
+        eletricistas = [Eletricista(nome=f'Eletricista {i}') for i in range(args.requisicoes)]
+        db.session.add_all(eletricistas)
+        db.session.commit()
+        eletricista_ids = [eletricista.id for eletricista in eletricistas]
+        item_ids = [item.id for item in FerramentaEPI.query.order_by(FerramentaEPI.id).limit(args.itens)]
+
+    login = app.test_client()
+    login.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    cookie = login.get_cookie('session').value
+
+    barreira = threading.Barrier(args.requisicoes)
+    resultados = Counter()
+    lock = threading.Lock()
+
+    def retirar(indice):
+        client = app.test_client()
+        client.set_cookie('session', cookie)
+        payload = {
+            'eletricista_id': eletricista_ids[indice],
+            'ferramenta_epi_id': item_ids[indice % len(item_ids)]
+        }
+        barreira.wait()
+        response = client.post('/api/atribuicoes', json=payload)
+        with lock:
+            resultados[response.status_code] += 1
+
+    threads = [threading.Thread(target=retirar, args=(i,)) for i in range(args.requisicoes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        abertas = Counter(
+            item_id for (item_id,) in db.session.query(AtribuicaoFerramentaEPI.ferramenta_epi_id)
+            .filter(AtribuicaoFerramentaEPI.data_devolucao.is_(None))
+        )
+
+    print(f'Requisições: {args.requisicoes} em {len(item_ids)} itens')
+    for status, quantidade in sorted(resultados.items()):
+        print(f'  HTTP {status}: {quantidade}')
+
+    falhas = []
+    if resultados[201] != len(item_ids):
+        falhas.append(f'esperadas {len(item_ids)} respostas 201, obtidas {resultados[201]}')
+    if set(resultados) - {201, 409}:
+        falhas.append('respostas diferentes de 201/409')
+    duplicados = [item_id for item_id in item_ids if abertas[item_id] != 1]
+    if duplicados:
+        falhas.append(f'itens sem exatamente uma atribuição em aberto: {duplicados}')
+
+    if falhas:
+        print('FALHOU: ' + '; '.join(falhas))
+        sys.exit(1)
+    print('OK: uma atribuição em aberto por item')
+
+if __name__ == '__main__':
+    main()
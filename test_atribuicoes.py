@@ -0,0 +1,47 @@
+import pytest
+
+@pytest.fixture
+def equipe(admin):
+    """Dois eletricistas com duas atribuições em aberto cada (itens 1-4)"""
+    for nome in ('Ana', 'Bruno'):
+        assert admin.post('/api/eletricistas', json={'nome': nome}).status_code == 201
+    for eletricista_id, item_id in [(1, 1), (1, 2), (2, 3), (2, 4)]:
+        resposta = admin.post('/api/atribuicoes', json={'eletricista_id': eletricista_id, 'ferramenta_epi_id': item_id})
+        assert resposta.status_code == 201
+    return admin
+
+def abertas(client):
+    return sorted(item['id'] for item in client.get('/api/atribuicoes').json if not item['data_devolucao'])
+
+def test_devolver_por_eletricista(equipe):
+    resposta = equipe.put('/api/atribuicoes/devolver', json={'eletricista_id': 1, 'observacao': 'Fim do turno'})
+    assert resposta.status_code == 200
+    assert [item['id'] for item in resposta.json['devolvidas']] == [1, 2]
+    assert {item['observacao'] for item in resposta.json['devolvidas']} == {'Fim do turno'}
+    assert abertas(equipe) == [3, 4]
+
+def test_devolver_equipe(equipe):
+    resposta = equipe.put('/api/atribuicoes/devolver', json={'eletricista_ids': [1, 2]})
+    assert len(resposta.json['devolvidas']) == 4
+    assert abertas(equipe) == []
+
+def test_devolver_por_ids_informa_as_que_nao_foram_devolvidas(equipe):
+    equipe.put('/api/atribuicoes/devolver', json={'atribuicao_ids': [1]})
+    resposta = equipe.put('/api/atribuicoes/devolver', json={'atribuicao_ids': [1, 3, 99]})
+    assert resposta.status_code == 200
+    assert [item['id'] for item in resposta.json['devolvidas']] == [3]
+    assert resposta.json['nao_devolvidas'] == [1, 99]
+
+@pytest.mark.parametrize('corpo', [
+    {'eletricista_ids': '12'},
+    {'atribuicao_ids': '3'},
+    {'atribuicao_ids': {'id': 3}},
+    {'eletricista_ids': ['a']},
+    [1, 2],
+    {}
+])
+def test_devolver_rejeita_corpo_invalido(equipe, corpo):
+    resposta = equipe.put('/api/atribuicoes/devolver', json=corpo)
+    assert resposta.status_code == 400
+    assert 'error' in resposta.json
+    assert abertas(equipe) == [1, 2, 3, 4]
@@ -0,0 +1,19 @@
+def test_dashboard_e_listas_completas(admin):
+    admin.post('/api/eletricistas', json={'nome': 'Ana'})
+    for item_id in (1, 2, 3):
+        admin.post('/api/atribuicoes', json={'eletricista_id': 1, 'ferramenta_epi_id': item_id})
+    admin.put('/api/atribuicoes/1/devolver', json={})
+
+    dashboard = admin.get('/api/dashboard').json
+    assert [item['id'] for item in dashboard['atribuicoes_abertas']] == [3, 2]
+    assert dashboard['contagens']['atribuicoes'] == 3
+    assert dashboard['contagens']['atribuicoes_abertas'] == 2
+    assert dashboard['contagens']['eletricistas'] == 1
+
+    # A aba de atribuições pagina a lista completa, com as devolvidas
+    pagina = admin.get('/api/atribuicoes?limit=2').json
+    restante = admin.get(f"/api/atribuicoes?limit=2&after={pagina['next_cursor']}").json
+    itens = pagina['items'] + restante['items']
+    assert [item['id'] for item in itens] == [3, 2, 1]
+    assert itens[2]['data_devolucao'] is not None
+    assert restante['next_cursor'] is None
@@ -0,0 +1,82 @@
+import os
+import time
+import uuid
+from datetime import datetime
+from src.models.user import db, User
+from src.routes.export_jobs import executar_job, limpar_expirados, salvar_job
+
+def criar_usuario(app, username, permissao):
+    with app.app_context():
+        usuario = User(username=username, permissao=permissao)
+        usuario.set_password('senha')
+        db.session.add(usuario)
+        db.session.commit()
+        return usuario.id
+
+def criar_job(app, user_id):
+    job = {
+        'id': uuid.uuid4().hex,
+        'tipo': 'atribuicoes',
+        'formato': 'excel',
+        'filtros': {},
+        'status': 'pendente',
+        'user_id': user_id,
+        'criado_em': datetime.utcnow().isoformat(),
+        'concluido_em': None,
+        'erro': None
+    }
+    os.makedirs(app.config['EXPORT_JOBS_DIR'], exist_ok=True)
+    salvar_job(app.config['EXPORT_JOBS_DIR'], job)
+    return job['id']
+
+def test_admin_rebaixado_perde_acesso_aos_jobs_dos_outros(app, client):
+    chefe_id = criar_usuario(app, 'chefe', 'admin')
+    job_id = criar_job(app, user_id=1)
+
+    assert client.post('/api/auth/login', json={'username': 'chefe', 'password': 'senha'}).status_code == 200
+    assert client.get(f'/api/export/jobs/{job_id}').status_code == 200
+
+    with app.app_context():
+        db.session.get(User, chefe_id).permissao = 'colaborador'
+        db.session.commit()
+    assert client.get(f'/api/export/jobs/{job_id}').status_code == 404
+
+def test_dono_ve_o_proprio_job(app, client):
+    colaborador_id = criar_usuario(app, 'tecnico', 'colaborador')
+    job_id = criar_job(app, user_id=colaborador_id)
+    client.post('/api/auth/login', json={'username': 'tecnico', 'password': 'senha'})
+    resposta = client.get(f'/api/export/jobs/{job_id}')
+    assert resposta.status_code == 200
+    assert resposta.json['status'] == 'pendente'
+
+def test_exportacao_em_segundo_plano(app, admin):
+    resposta = admin.post('/api/export/jobs', json={'tipo': 'atribuicoes', 'formato': 'excel'})
+    assert resposta.status_code == 202
+    job_id = resposta.json['id']
+
+    limite = time.time() + 60
+    while time.time() < limite:
+        job = admin.get(f'/api/export/jobs/{job_id}').json
+        if job['status'] in ('concluido', 'erro'):
+            break
+        time.sleep(0.2)
+    assert job['status'] == 'concluido', job
+
+    download = admin.get(job['download_url'])
+    assert download.status_code == 200
+    assert download.data[:2] == b'PK'
+
+def test_job_removido_antes_de_executar(app, tmp_path):
+    # O worker do pool não falha se o job expirou antes de ser processado
+    assert executar_job(str(tmp_path), uuid.uuid4().hex, app.config['SQLALCHEMY_DATABASE_URI']) is None
+
+def test_jobs_expiram_em_qualquer_status(app):
+    diretorio = app.config['EXPORT_JOBS_DIR']
+    antigo = criar_job(app, user_id=1)
+    recente = criar_job(app, user_id=1)
+    vencido = time.time() - app.config['EXPORT_JOBS_TTL'] - 10
+    os.utime(os.path.join(diretorio, f'{antigo}.json'), (vencido, vencido))
+
+    with app.app_context():
+        limpar_expirados(diretorio)
+    assert sorted(os.listdir(diretorio)) == [f'{recente}.json']
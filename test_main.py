@@ -0,0 +1,25 @@
+from sqlalchemy import inspect
+from src.main import create_app, inicializar_banco
+from src.models import search_index
+from src.models.search_index import criterio_busca
+from src.models.user import FerramentaEPI, db
+
+def test_create_app_nao_toca_no_banco(tmp_path):
+    caminho = tmp_path / 'database' / 'app.db'
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}'})
+    assert not caminho.parent.exists()
+
+    caminho.parent.mkdir()
+    inicializar_banco(app)
+    with app.app_context():
+        assert 'ferramenta_epi' in inspect(db.engine).get_table_names()
+        db.engine.dispose()
+
+def test_indice_detectado_na_primeira_busca(app):
+    # Worker que não rodou inicializar_banco(): ainda não sabe se o índice existe
+    search_index._disponivel = None
+    with app.app_context():
+        criterio = criterio_busca(FerramentaEPI, {'nome': 'multimetro'})
+        assert search_index._disponivel is True
+        nomes = [item.nome for item in FerramentaEPI.query.filter(criterio)]
+    assert nomes == ['Multímetro']
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from src.models.user import db, Eletricista
+
+def criar_eletricistas(app, quantidade, inicio=datetime(2024, 1, 1), com_data=True):
+    # Pelo ORM, para as datas ficarem no formato que o SQLAlchemy grava
+    with app.app_context():
+        # render_nulls: sem ele o ORM omite o None e o default da coluna preenche a data
+        db.session.execute(insert(Eletricista).execution_options(render_nulls=True), [
+            {'nome': f'Eletricista {i}', 'data_criacao': inicio + timedelta(minutes=i) if com_data else None}
+            for i in range(quantidade)
+        ])
+        db.session.commit()
+
+def percorrer(client, url, cursor=None):
+    ids = []
+    while True:
+        resposta = client.get(url + (f'&after={cursor}' if cursor else ''))
+        assert resposta.status_code == 200
+        ids += [item['id'] for item in resposta.json['items']]
+        cursor = resposta.json['next_cursor']
+        if not cursor:
+            return ids
+
+def test_paginas_estaveis_com_insercoes(app, admin):
+    criar_eletricistas(app, 10)
+    primeira = admin.get('/api/eletricistas?limit=4').json
+    assert [item['id'] for item in primeira['items']] == [10, 9, 8, 7]
+
+    # Registros novos entram no topo e não deslocam as páginas seguintes
+    criar_eletricistas(app, 3, inicio=datetime(2025, 1, 1))
+    assert percorrer(admin, '/api/eletricistas?limit=4', primeira['next_cursor']) == [6, 5, 4, 3, 2, 1]
+
+def test_registros_sem_data_vem_por_ultimo(app, admin):
+    criar_eletricistas(app, 3)
+    criar_eletricistas(app, 5, com_data=False)
+    assert percorrer(admin, '/api/eletricistas?limit=2') == [3, 2, 1, 8, 7, 6, 5, 4]
+
+def test_cursor_e_limite_invalidos(admin):
+    assert admin.get('/api/eletricistas?limit=2&after=xyz').status_code == 400
+    assert admin.get('/api/eletricistas?limit=0').status_code == 400
+    assert admin.get('/api/eletricistas?limit=abc').status_code == 400
@@ -0,0 +1,27 @@
+from datetime import datetime
+import pytest
+from src.models.user import db, AtribuicaoFerramentaEPI, Eletricista
+from src.models.serializers import CampoInvalido, serializador_atribuicoes, serializador_eletricistas
+
+def test_colunas_geram_o_mesmo_payload_do_to_dict(app, admin):
+    admin.post('/api/eletricistas', json={'nome': "O'Brien \"Zé\""})
+    admin.post('/api/atribuicoes', json={'eletricista_id': 1, 'ferramenta_epi_id': 1, 'observacao': 'ok'})
+    admin.post('/api/atribuicoes', json={'eletricista_id': 1, 'ferramenta_epi_id': 2})
+    admin.put('/api/atribuicoes/1/devolver', json={})
+
+    with app.app_context():
+        esperado = [atribuicao.to_dict() for atribuicao in AtribuicaoFerramentaEPI.query.order_by(AtribuicaoFerramentaEPI.id)]
+        obtido = serializador_atribuicoes(serializador_atribuicoes.query().order_by(AtribuicaoFerramentaEPI.id))
+    assert obtido == esperado
+    assert obtido[1]['data_devolucao'] is None
+
+def test_fields_mantem_a_ordem_e_omite_colunas_ocultas(app):
+    with app.app_context():
+        db.session.add(Eletricista(nome='Ana', data_criacao=datetime(2024, 5, 1, 8, 30)))
+        db.session.commit()
+        parcial = serializador_eletricistas.selecionar(['nome'])
+        assert parcial(parcial.query()) == [{'nome': 'Ana'}]
+        com_data = serializador_eletricistas.selecionar(['data_criacao', 'nome'])
+        assert com_data(com_data.query()) == [{'nome': 'Ana', 'data_criacao': '2024-05-01T08:30:00'}]
+        with pytest.raises(CampoInvalido):
+            serializador_eletricistas.selecionar(['senha'])
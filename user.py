@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from datetime import datetime
+from src.models.senhas import gerar_hash
 
 db = SQLAlchemy()
 
@@ -12,7 +13,7 @@ class User(db.Model):
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = gerar_hash(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -32,10 +33,19 @@ class Eletricista(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    # Alterado por último em (feed /alteracoes)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relacionamentos
     atribuicoes = db.relationship('AtribuicaoFerramentaEPI', backref='eletricista', lazy=True)
 
+    __table_args__ = (
+        # Índice usado pela paginação por cursor (data, id)
+        db.Index('ix_eletricista_data_criacao_id', 'data_criacao', 'id'),
+        # Índice usado pelo feed de alterações
+        db.Index('ix_eletricista_data_atualizacao_id', 'data_atualizacao', 'id')
+    )
+
     def __repr__(self):
         return f'<Eletricista {self.nome}>'
 
@@ -51,10 +61,19 @@ class FerramentaEPI(db.Model):
     nome = db.Column(db.String(100), nullable=False)
     tipo = db.Column(db.String(20), nullable=False)  # Ferramenta ou EPI
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    # Alterado por último em (feed /alteracoes)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relacionamentos
     atribuicoes = db.relationship('AtribuicaoFerramentaEPI', backref='ferramenta_epi', lazy=True)
 
+    __table_args__ = (
+        # Índice usado pela paginação por cursor (data, id)
+        db.Index('ix_ferramenta_epi_data_criacao_id', 'data_criacao', 'id'),
+        # Índice usado pelo feed de alterações
+        db.Index('ix_ferramenta_epi_data_atualizacao_id', 'data_atualizacao', 'id')
+    )
+
     def __repr__(self):
         return f'<{self.tipo} {self.nome}>'
 
@@ -68,11 +87,26 @@ class FerramentaEPI(db.Model):
 
 class AtribuicaoFerramentaEPI(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    eletricista_id = db.Column(db.Integer, db.ForeignKey('eletricista.id'), nullable=False)
+    eletricista_id = db.Column(db.Integer, db.ForeignKey('eletricista.id'), nullable=False, index=True)
     ferramenta_epi_id = db.Column(db.Integer, db.ForeignKey('ferramenta_epi.id'), nullable=False)
     data_retirada = db.Column(db.DateTime, default=datetime.utcnow)
     data_devolucao = db.Column(db.DateTime, nullable=True)
     observacao = db.Column(db.Text, nullable=True)
+    # Alterado por último em (feed /alteracoes)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Índice usado pela paginação por cursor (data, id)
+        db.Index('ix_atribuicao_ferramenta_epi_data_retirada_id', 'data_retirada', 'id'),
+        # Índice usado pelo feed de alterações
+        db.Index('ix_atribuicao_ferramenta_epi_data_atualizacao_id', 'data_atualizacao', 'id'),
+        # Atribuições em aberto de um item
+        db.Index('ix_atribuicao_ferramenta_epi_item_devolucao', 'ferramenta_epi_id', 'data_devolucao'),
+        # No máximo uma atribuição em aberto por ferramenta/EPI, garantido pelo banco
+        db.Index('uq_atribuicao_ferramenta_epi_item_aberto', 'ferramenta_epi_id', unique=True,
+                 sqlite_where=db.text('data_devolucao IS NULL'),
+                 postgresql_where=db.text('data_devolucao IS NULL'))
+    )
 
     def __repr__(self):
         return f'<Atribuicao {self.eletricista_id}-{self.ferramenta_epi_id}>'
@@ -94,10 +128,19 @@ class Veiculo(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     identificacao = db.Column(db.String(50), unique=True, nullable=False)
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    # Alterado por último em (feed /alteracoes)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relacionamentos
     servicos_externos = db.relationship('ServicoExterno', backref='veiculo', lazy=True)
 
+    __table_args__ = (
+        # Índice usado pela paginação por cursor (data, id)
+        db.Index('ix_veiculo_data_criacao_id', 'data_criacao', 'id'),
+        # Índice usado pelo feed de alterações
+        db.Index('ix_veiculo_data_atualizacao_id', 'data_atualizacao', 'id')
+    )
+
     def __repr__(self):
         return f'<Veiculo {self.identificacao}>'
 
@@ -110,11 +153,13 @@ class Veiculo(db.Model):
 
 class ServicoExterno(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    colaborador_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    veiculo_id = db.Column(db.Integer, db.ForeignKey('veiculo.id'), nullable=False)
+    colaborador_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    veiculo_id = db.Column(db.Integer, db.ForeignKey('veiculo.id'), nullable=False, index=True)
     destino = db.Column(db.String(200), nullable=False)
     empresa_atendida = db.Column(db.String(200), nullable=False)
     data_hora_saida = db.Column(db.DateTime, default=datetime.utcnow)
+    # Alterado por último em (feed /alteracoes)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relacionamentos
     colaborador = db.relationship('User', backref='servicos_externos')
@@ -122,6 +167,13 @@ class ServicoExterno(db.Model):
     checklist_cinto = db.relationship('ChecklistCinto', backref='servico_externo', uselist=False, cascade='all, delete-orphan')
     checklist_escada = db.relationship('ChecklistEscada', backref='servico_externo', uselist=False, cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # Índice usado pela paginação por cursor (data, id)
+        db.Index('ix_servico_externo_data_hora_saida_id', 'data_hora_saida', 'id'),
+        # Índice usado pelo feed de alterações
+        db.Index('ix_servico_externo_data_atualizacao_id', 'data_atualizacao', 'id')
+    )
+
     def __repr__(self):
         return f'<ServicoExterno {self.destino}>'
 
@@ -139,7 +191,7 @@ class ServicoExterno(db.Model):
 
 class MaterialServicoExterno(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    servico_externo_id = db.Column(db.Integer, db.ForeignKey('servico_externo.id'), nullable=False)
+    servico_externo_id = db.Column(db.Integer, db.ForeignKey('servico_externo.id'), nullable=False, index=True)
     nome = db.Column(db.String(100), nullable=False)
     tipo = db.Column(db.String(50), nullable=False)
     status = db.Column(db.String(1), nullable=False)  # B/I/N/A
@@ -162,7 +214,7 @@ class MaterialServicoExterno(db.Model):
 
 class ChecklistCinto(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    servico_externo_id = db.Column(db.Integer, db.ForeignKey('servico_externo.id'), nullable=False)
+    servico_externo_id = db.Column(db.Integer, db.ForeignKey('servico_externo.id'), nullable=False, index=True)
     cinto_seguranca_status = db.Column(db.String(1), nullable=False)  # B/I/N/A
     talabarte_status = db.Column(db.String(1), nullable=False)  # B/I/N/A
     mosquetao_status = db.Column(db.String(1), nullable=False)  # B/I/N/A
@@ -183,7 +235,7 @@ class ChecklistCinto(db.Model):
 
 class ChecklistEscada(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    servico_externo_id = db.Column(db.Integer, db.ForeignKey('servico_externo.id'), nullable=False)
+    servico_externo_id = db.Column(db.Integer, db.ForeignKey('servico_externo.id'), nullable=False, index=True)
     escada_simples_status = db.Column(db.String(1), nullable=False)  # B/I/N/A
     escada_extensivel_status = db.Column(db.String(1), nullable=False)  # B/I/N/A
     degraus_status = db.Column(db.String(1), nullable=False)  # B/I/N/A
@@ -204,3 +256,28 @@ class ChecklistEscada(db.Model):
             'observacoes': self.observacoes
         }
 
+
+class VersaoTabela(db.Model):
+    """Contador de alterações por tabela, usado nas ETags das rotas GET"""
+    __tablename__ = 'versao_tabela'
+
+    tabela = db.Column(db.String(100), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VersaoTabela {self.tabela} {self.versao}>'
+
+class RegistroExcluido(db.Model):
+    """Lápide de um registro excluído, gravada por gatilho do banco (ver src/models/alteracoes.py)"""
+    __tablename__ = 'registro_excluido'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tabela = db.Column(db.String(100), nullable=False)
+    registro_id = db.Column(db.Integer, nullable=False)
+    data_exclusao = db.Column(db.DateTime, nullable=False)
+
+    # Índice usado pelo feed de alterações
+    __table_args__ = (db.Index('ix_registro_excluido_data_exclusao_id', 'data_exclusao', 'id'),)
+
+    def __repr__(self):
+        return f'<RegistroExcluido {self.tabela} {self.registro_id}>'
@@ -1,7 +1,14 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, abort, jsonify, request, session
 from src.models.user import (Veiculo, ServicoExterno, MaterialServicoExterno, 
                             ChecklistCinto, ChecklistEscada, User, db)
 from src.routes.auth import require_auth, require_admin
+from src.routes.pagination import listar, paginacao_solicitada
+from src.routes.streaming import formato_stream
+from src.routes.campos import projetar, serializador_solicitado
+from src.models.cache_referencias import cache_veiculos
+from src.routes.condicional import condicional
+from src.models.serializers import (TABELAS_SERVICOS, CampoInvalido, carregar_servicos, serializar_servico,
+                                    serializador_servicos, serializador_veiculos)
 from datetime import datetime
 
 veiculo_bp = Blueprint('veiculo', __name__)
@@ -9,9 +16,19 @@ veiculo_bp = Blueprint('veiculo', __name__)
 # Rotas para veículos
 @veiculo_bp.route('/veiculos', methods=['GET'])
 @require_auth
+@condicional('veiculo')
 def get_veiculos():
-    veiculos = Veiculo.query.all()
-    return jsonify([veiculo.to_dict() for veiculo in veiculos])
+    try:
+        serializador = serializador_solicitado(serializador_veiculos)
+    except CampoInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not paginacao_solicitada() and not formato_stream():
+        itens = cache_veiculos.listar()
+        if serializador is not serializador_veiculos:
+            itens = projetar(itens, serializador)
+        return jsonify(itens)
+    return listar(serializador.query(), Veiculo.data_criacao, Veiculo.id, serializador)
 
 @veiculo_bp.route('/veiculos', methods=['POST'])
 @require_admin
@@ -35,9 +52,12 @@ def create_veiculo():
 
 @veiculo_bp.route('/veiculos/<int:veiculo_id>', methods=['GET'])
 @require_auth
+@condicional('veiculo')
 def get_veiculo(veiculo_id):
-    veiculo = Veiculo.query.get_or_404(veiculo_id)
-    return jsonify(veiculo.to_dict())
+    veiculo = cache_veiculos.obter(veiculo_id)
+    if veiculo is None:
+        abort(404)
+    return jsonify(veiculo)
 
 @veiculo_bp.route('/veiculos/<int:veiculo_id>', methods=['PUT'])
 @require_admin
@@ -67,19 +87,14 @@ def delete_veiculo(veiculo_id):
 # Rotas para serviços externos
 @veiculo_bp.route('/servicos-externos', methods=['GET'])
 @require_auth
+@condicional(*TABELAS_SERVICOS)
 def get_servicos_externos():
-    servicos = ServicoExterno.query.all()
-    result = []
-    for servico in servicos:
-        servico_dict = servico.to_dict()
-        # Incluir materiais, checklist cinto e checklist escada
-        servico_dict['materiais'] = [material.to_dict() for material in servico.materiais]
-        if servico.checklist_cinto:
-            servico_dict['checklist_cinto'] = servico.checklist_cinto.to_dict()
-        if servico.checklist_escada:
-            servico_dict['checklist_escada'] = servico.checklist_escada.to_dict()
-        result.append(servico_dict)
-    return jsonify(result)
+    # Materiais, checklist cinto e checklist escada carregados em lote (ou só os de ?include)
+    try:
+        serializador = serializador_solicitado(serializador_servicos)
+    except CampoInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    return listar(serializador.query(), ServicoExterno.data_hora_saida, ServicoExterno.id, serializador)
 
 @veiculo_bp.route('/servicos-externos', methods=['POST'])
 @require_auth
@@ -95,9 +110,8 @@ def create_servico_externo():
     if not veiculo_id or not destino or not empresa_atendida:
         return jsonify({'error': 'Veículo, destino e empresa atendida são obrigatórios'}), 400
     
-    # Verificar se o veículo existe
-    veiculo = Veiculo.query.get(veiculo_id)
-    if not veiculo:
+    # Verificar se o veículo existe (cache de referências)
+    if not cache_veiculos.obter(veiculo_id):
         return jsonify({'error': 'Veículo não encontrado'}), 404
     
     # Criar serviço externo
@@ -152,18 +166,10 @@ def create_servico_externo():
 
 @veiculo_bp.route('/servicos-externos/<int:servico_id>', methods=['GET'])
 @require_auth
+@condicional(*TABELAS_SERVICOS)
 def get_servico_externo(servico_id):
-    servico = ServicoExterno.query.get_or_404(servico_id)
-    servico_dict = servico.to_dict()
-    
-    # Incluir materiais, checklist cinto e checklist escada
-    servico_dict['materiais'] = [material.to_dict() for material in servico.materiais]
-    if servico.checklist_cinto:
-        servico_dict['checklist_cinto'] = servico.checklist_cinto.to_dict()
-    if servico.checklist_escada:
-        servico_dict['checklist_escada'] = servico.checklist_escada.to_dict()
-    
-    return jsonify(servico_dict)
+    servico = carregar_servicos(ServicoExterno.query).filter_by(id=servico_id).first_or_404()
+    return jsonify(serializar_servico(servico))
 
 @veiculo_bp.route('/servicos-externos/<int:servico_id>', methods=['PUT'])
 @require_auth
@@ -177,8 +183,7 @@ def update_servico_externo(servico_id):
     if 'empresa_atendida' in data:
         servico.empresa_atendida = data['empresa_atendida']
     if 'veiculo_id' in data:
-        veiculo = Veiculo.query.get(data['veiculo_id'])
-        if not veiculo:
+        if not cache_veiculos.obter(data['veiculo_id']):
             return jsonify({'error': 'Veículo não encontrado'}), 404
         servico.veiculo_id = data['veiculo_id']
     
@@ -237,6 +242,8 @@ def update_servico_externo(servico_id):
             )
             db.session.add(escada)
     
+    # Materiais e checklists ficam em outras tabelas: marca o serviço como alterado para o feed /alteracoes
+    servico.data_atualizacao = datetime.utcnow()
     db.session.commit()
     return jsonify(servico.to_dict())
 
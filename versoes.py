@@ -0,0 +1,64 @@
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+from src.models.user import db, VersaoTabela
+
+# Cada INSERT/UPDATE/DELETE feito pelo ORM incrementa o contador da tabela
+# em versao_tabela, na mesma transação da alteração. As rotas GET montam a
+# ETag a partir desses contadores e respondem 304 sem ler os registros.
+
+INCREMENTAR = text(
+    'INSERT INTO versao_tabela (tabela, versao) VALUES (:tabela, 1) '
+    'ON CONFLICT (tabela) DO UPDATE SET versao = versao_tabela.versao + 1'
+)
+
+# Funções chamadas após cada commit com o conjunto de tabelas alteradas
+# (ex.: invalidação dos caches do processo)
+OUVINTES = []
+
+def ao_alterar(funcao):
+    OUVINTES.append(funcao)
+    return funcao
+
+def incrementar_versoes(session, tabelas):
+    tabelas = sorted(set(tabelas) - {VersaoTabela.__tablename__})
+    if tabelas:
+        session.connection().execute(INCREMENTAR, [{'tabela': tabela} for tabela in tabelas])
+        session.info.setdefault('tabelas_alteradas', set()).update(tabelas)
+
+def versoes(*tabelas):
+    """Versão atual de cada tabela (0 se nunca foi alterada)"""
+    linhas = db.session.execute(
+        select(VersaoTabela.tabela, VersaoTabela.versao).where(VersaoTabela.tabela.in_(tabelas))
+    ).all()
+    atuais = dict(linhas)
+    return {tabela: atuais.get(tabela, 0) for tabela in tabelas}
+
+@event.listens_for(Session, 'after_flush')
+def _apos_flush(session, flush_context):
+    tabelas = {objeto.__table__.name for objeto in session.new}
+    tabelas.update(objeto.__table__.name for objeto in session.deleted)
+    tabelas.update(
+        objeto.__table__.name for objeto in session.dirty
+        if session.is_modified(objeto, include_collections=False)
+    )
+    incrementar_versoes(session, tabelas)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _apos_escrita_em_lote(orm_execute_state):
+    # INSERT/UPDATE/DELETE em lote (insert(Modelo), db.update, query.update...) não passam pelo flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    resultado = orm_execute_state.invoke_statement()
+    incrementar_versoes(orm_execute_state.session, [orm_execute_state.statement.table.name])
+    return resultado
+
+@event.listens_for(Session, 'after_commit')
+def _apos_commit(session):
+    tabelas = session.info.pop('tabelas_alteradas', None)
+    if tabelas:
+        for ouvinte in OUVINTES:
+            ouvinte(tabelas)
+
+@event.listens_for(Session, 'after_rollback')
+def _apos_rollback(session):
+    session.info.pop('tabelas_alteradas', None)
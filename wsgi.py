@@ -0,0 +1,15 @@
+"""Ponto de entrada WSGI para servidores externos.
+
+    gunicorn --preload -w 4 --threads 4 -k gthread 'src.wsgi:app'
+
+O banco precisa estar inicializado antes (`flask --app src.main init-db`);
+src/serve.py faz as duas coisas.
+"""
+import os
+import sys
+# Mesmo ajuste de caminho do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import create_app
+
+app = create_app()